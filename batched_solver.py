@@ -0,0 +1,139 @@
+from typing import Optional, Sequence
+
+import numpy as np
+from scipy.sparse import csc_array, eye_array
+from scipy.sparse.linalg import SuperLU, splu, spsolve_triangular
+
+from periodic_boundary import CompiledBoundary, boundary_table
+from solver import RUNGE_KUTTA_SCHEMES, HeatEquationSolver, TimeScheme, runge_kutta_step
+
+
+class BatchedHeatEquationSolver:
+    """
+    Many boundary/conductivity scenarios on the geometry of one prepared HeatEquationSolver.
+
+    Scenario `s` uses the boundary table of the solver with hot temperature `values[s]`
+    and conductivity `k[s]`; all scenarios advance together with the scheme and `delta` of the solver.
+    The field `u` has shape (scenario_count, element_count).
+    """
+
+    def __init__(
+            self,
+            solver: HeatEquationSolver,
+            values: Sequence[Optional[float]] = (None,),
+            k: Optional[Sequence[float]] = None
+    ):
+        mesh = solver.mesh
+        if not np.all(mesh.k == mesh.k[0]):
+            raise ValueError("Scenario conductivity requires a mesh with uniform k")
+        if k is None:
+            k = [float(mesh.k[0])]
+        values = list(values)
+        k = list(k)
+        self.scenario_count: int = max(len(values), len(k))
+        if len(values) == 1:
+            values = values * self.scenario_count
+        if len(k) == 1:
+            k = k * self.scenario_count
+        if len(values) != self.scenario_count or len(k) != self.scenario_count:
+            raise ValueError("values and k must have the same length or a single entry")
+
+        self.solver: HeatEquationSolver = solver
+        self.values: list[Optional[float]] = values
+        self.k: np.ndarray = np.array(k, dtype=np.float64)
+        self.iteration_count: int = 0
+        self.time: float = 0
+
+        #  внутри поле хранится как (element_count, scenario_count) для умножения разреженной матрицы на блок
+        self._u: np.ndarray = np.zeros((mesh.element_count, self.scenario_count), dtype=np.float64)
+        self.bound_u: np.ndarray = np.zeros((self.scenario_count, mesh.face_count), dtype=np.float64)
+        self._boundary_matrix = mesh.boundary_matrix()
+        #  потоки пропорциональны k, поэтому сценарий отличается множителем оператора
+        self._scale: np.ndarray = self.k / mesh.k[0]
+        self._groups: list[tuple[float, np.ndarray]] = [
+            (float(scale), np.flatnonzero(self._scale == scale)) for scale in np.unique(self._scale)
+        ]
+        self._factors: dict[tuple[TimeScheme, float, float], SuperLU | csc_array] = dict()
+
+        table = solver.boundary_conditions if solver.boundary_conditions is not None else boundary_table(solver.domain)
+        compiled: dict[Optional[float], CompiledBoundary] = dict()
+        for value in values:
+            if value not in compiled:
+                compiled[value] = table.compile(
+                    mesh.face_count, mesh.bound_face, mesh.bound_domain, mesh.bound_group, value
+                )
+        self._boundaries: list[CompiledBoundary] = [compiled[value] for value in values]
+        for s, boundary in enumerate(self._boundaries):
+            self.bound_u[s] = boundary.initial(self.time)
+
+    @property
+    def u(self) -> np.ndarray:
+        return self._u.T
+
+    @property
+    def boundary_is_static(self) -> bool:
+        return all(boundary.is_static for boundary in self._boundaries)
+
+    def set_periodic_boundary(self) -> None:
+        for s, boundary in enumerate(self._boundaries):
+            boundary.apply(self.bound_u[s], self.time)
+
+    def boundary_source(self) -> np.ndarray:
+        return self._boundary_matrix @ self.bound_u.T
+
+    def _cached(self, scale: float, build):
+        key = (self.solver.scheme, self.solver.delta, scale)
+        if key not in self._factors:
+            self._factors[key] = build()
+        return self._factors[key]
+
+    def step(self, bc: np.ndarray) -> None:
+        solver = self.solver
+        delta = solver.delta
+        u = self._u
+        n = solver.element_count
+
+        if solver.scheme == TimeScheme.jacobi:
+            self._u = u + (delta * self._scale) * (bc - solver.operator @ u)
+            return
+        if solver.scheme in RUNGE_KUTTA_SCHEMES:
+            #  границы берутся на начало шага
+            self._u = runge_kutta_step(
+                solver.scheme, u, self.time, delta, lambda v, t: self._scale * (bc - solver.operator @ v)
+            )
+            return
+
+        u_new = np.empty_like(u)
+        for scale, columns in self._groups:
+            step = delta * scale
+            u_group = u[:, columns]
+            if solver.scheme == TimeScheme.explicit:
+                lower_step = self._cached(
+                    scale, lambda: csc_array(eye_array(n, format="csc") + step * solver._lower)
+                )
+                rhs = u_group + step * (bc[:, columns] - solver._upper @ u_group - solver._ac[:, None] * u_group)
+                u_new[:, columns] = spsolve_triangular(lower_step, rhs, lower=True, unit_diagonal=True, overwrite_b=True)
+            else:
+                theta = 1 if solver.scheme == TimeScheme.backward_euler else 0.5
+                factor = self._cached(
+                    scale, lambda: splu(csc_array(eye_array(n, format="csc") + (theta * step) * solver.operator))
+                )
+                rhs = u_group + step * bc[:, columns]
+                if theta != 1:
+                    rhs -= ((1 - theta) * step) * (solver.operator @ u_group)
+                u_new[:, columns] = factor.solve(rhs)
+        self._u = u_new
+
+    def run_physics(self, n_steps: int = 1) -> None:
+        """
+        Advance all scenarios by `n_steps` steps. With static boundaries the boundary source is computed once per call.
+        """
+        static = self.boundary_is_static
+        bc = self.boundary_source()
+        for _ in range(n_steps):
+            if not static:
+                self.set_periodic_boundary()
+                bc = self.boundary_source()
+            self.step(bc)
+            self.iteration_count += 1
+            self.time += self.solver.delta
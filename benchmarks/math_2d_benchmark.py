@@ -0,0 +1,45 @@
+"""
+Micro-benchmark of math_2d: scalar Vector2D arithmetic and Geometry2D on one polygon at a time
+against the same functions called once with Vector2DArray.
+
+Run from the repository root: python -m benchmarks.math_2d_benchmark
+"""
+import timeit
+
+import numpy as np
+
+from math_2d import Geometry2D, Vector2D, Vector2DArray
+
+
+def vector_ops(a: Vector2D, b: Vector2D) -> float:
+    c = (a + b) * 0.5 - a / 3
+    c += b
+    return c.get_normalize() * Geometry2D.line_normal(a, b) + c.__len__()
+
+
+def main(polygon_count: int = 20000, repeat: int = 5):
+    rng = np.random.default_rng(0)
+    a, b = Vector2D(1.5, -2.0), Vector2D(0.25, 3.0)
+    ops_time = min(timeit.repeat(lambda: vector_ops(a, b), number=100000, repeat=repeat)) / 100000
+    print(f"Vector2D expression: {ops_time * 1e6:.3f} us")
+
+    x = rng.random((polygon_count, 3))
+    y = rng.random((polygon_count, 3))
+    polygons = [[Vector2D(x[p, v], y[p, v]) for v in range(3)] for p in range(polygon_count)]
+    batch = [Vector2DArray(x[:, v], y[:, v]) for v in range(3)]
+
+    def per_polygon():
+        for vertex in polygons:
+            Geometry2D.polygon_centroid_area(vertex)
+
+    def batched():
+        Geometry2D.polygon_centroid_area(batch)
+
+    loop_time = min(timeit.repeat(per_polygon, number=1, repeat=repeat))
+    batch_time = min(timeit.repeat(batched, number=1, repeat=repeat))
+    print(f"polygon_centroid_area, {polygon_count} triangles: Vector2D loop {loop_time * 1e3:.2f} ms, "
+          f"Vector2DArray {batch_time * 1e3:.2f} ms, speed-up {loop_time / batch_time:.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Strong-scaling benchmark of PartitionedHeatEquationSolver: the same mesh and step count
+for 1..N worker processes, compared with the serial Jacobi step.
+
+Run from the repository root: python -m benchmarks.parallel_scaling --mesh stdref --refine 2 --workers 8
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from loader import load_from_file
+from mesh_refine import refine_uniform
+from parallel_solver import PartitionedHeatEquationSolver
+from solver import HeatEquationSolver, TimeScheme
+
+
+def build_solver(domain: str, mesh: tuple[np.ndarray, np.ndarray, np.ndarray]) -> HeatEquationSolver:
+    solver = HeatEquationSolver(domain, scheme=TimeScheme.jacobi)
+    solver.create_volume_decomposition(*mesh)
+    return solver
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mesh", default="stdref")
+    parser.add_argument("--refine", type=int, default=2, help="uniform refinement levels applied to the mesh")
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    mesh = refine_uniform(*load_from_file(args.mesh), levels=args.refine)
+
+    serial = build_solver(args.mesh, mesh)
+    start = time.perf_counter()
+    serial.run_physics(args.steps)
+    serial_time = time.perf_counter() - start
+    print(f"{args.mesh} x{4 ** args.refine}: {serial.element_count} elements, {args.steps} steps")
+    print(f"serial: {serial_time:.3f} s")
+
+    workers = 1
+    while workers <= args.workers:
+        solver = build_solver(args.mesh, mesh)
+        with PartitionedHeatEquationSolver(solver, workers) as parallel:
+            parallel.run_physics(1)  # прогрев процессов
+            start = time.perf_counter()
+            parallel.run_physics(args.steps - 1)
+            elapsed = time.perf_counter() - start
+        elapsed *= args.steps / max(args.steps - 1, 1)
+        exact = np.array_equal(solver.u, serial.u)
+        print(f"workers {workers:3d}: {elapsed:.3f} s, speed-up {serial_time / elapsed:.2f}, exact {exact}")
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
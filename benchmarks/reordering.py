@@ -0,0 +1,60 @@
+"""
+Step time of the array kernels with the element order of the .out file, a random order
+and the orderings of mesh_reorder, on a mesh and its uniform refinements.
+
+Run from the repository root: python -m benchmarks.reordering --mesh stdref --refine 0 1 2 3
+"""
+import argparse
+import time
+
+import numpy as np
+
+from loader import load_from_file
+from mesh_refine import refine_uniform
+from mesh_reorder import Ordering, bandwidth
+from solver import HeatEquationSolver, TimeScheme
+
+
+def step_time(solver: HeatEquationSolver, steps: int, repeat: int) -> float:
+    solver.run_physics(1)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        solver.run_physics(steps)
+        best = min(best, time.perf_counter() - start)
+    return best / steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mesh", default="stdref")
+    parser.add_argument("--refine", nargs="+", type=int, default=[0, 1, 2, 3])
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    schemes = (TimeScheme.explicit, TimeScheme.jacobi)
+    for level in args.refine:
+        mesh = refine_uniform(*load_from_file(args.mesh), levels=level)
+        print(f"{args.mesh} x{4 ** level}")
+        for name in ["file", "random"] + [ordering.name for ordering in Ordering]:
+            times = []
+            for scheme in schemes:
+                solver = HeatEquationSolver(args.mesh, scheme=scheme)
+                solver.create_volume_decomposition(*mesh)
+                if name == "random":
+                    order = np.random.default_rng(0).permutation(solver.element_count)
+                    solver.mesh = solver.mesh.permute(order)
+                    solver.compile_boundary()
+                    solver.build_operators()
+                elif name != "file":
+                    solver.reorder(Ordering[name])
+                times.append(step_time(solver, args.steps, args.repeat))
+            print(
+                f"  {name:>8}: {solver.element_count} elements, bandwidth {bandwidth(solver.mesh):8d}, "
+                + ", ".join(f"{scheme.name} {t * 1e3:8.3f} ms" for scheme, t in zip(schemes, times))
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Cold-start time of the command line: wall time of fresh interpreter processes running main.py,
+with the in-process breakdown reported by `main.py run --timings`.
+
+Run from the repository root: python -m benchmarks.startup --mesh p --repeat 5
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+
+def wall_time(command: list[str]) -> tuple[float, str]:
+    start = time.perf_counter()
+    completed = subprocess.run(command, capture_output=True, text=True, check=True)
+    return time.perf_counter() - start, completed.stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mesh", default="p")
+    parser.add_argument("--steps", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    commands = {
+        "interpreter": [sys.executable, "-c", "pass"],
+        "help": [sys.executable, "main.py", "--help"],
+        "headless job": [
+            sys.executable, "main.py", "run", "--mesh", args.mesh, "--steps", str(args.steps), "--timings"
+        ],
+    }
+    for name, command in commands.items():
+        times = []
+        output = ""
+        for _ in range(args.repeat):
+            elapsed, output = wall_time(command)
+            times.append(elapsed)
+        times.sort()
+        print(f"{name:>13}: median {times[len(times) // 2] * 1e3:8.1f} ms, best {times[0] * 1e3:8.1f} ms")
+        if name == "headless job":
+            timings = json.loads(output[output.index("{"):])
+            print(
+                f"{'':>13}  startup {timings['startup_s'] * 1e3:.1f} ms, imports {timings['imports_s'] * 1e3:.1f} ms, "
+                f"setup {timings['setup_s'] * 1e3:.1f} ms, run {timings['run_s'] * 1e3:.1f} ms, "
+                f"matplotlib loaded: {timings['matplotlib_loaded']}"
+            )
+
+
+if __name__ == '__main__':
+    main()
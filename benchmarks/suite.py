@@ -0,0 +1,172 @@
+"""
+Benchmark suite over the bundled meshes and their uniform refinements.
+
+For every mesh and refinement level it measures the parse time of the .out file (without and with
+the array cache), the setup phases of create_volume_decomposition (mesh arrays, boundary, operators),
+the time per run_physics step and the peak traced memory of setup and stepping. Results are written as JSON;
+`compare` flags metrics that got slower (or larger) than the baseline by more than a threshold.
+
+Run from the repository root:
+    python -m benchmarks.suite run --refine 0 1 2 --output results.json
+    python -m benchmarks.suite compare baseline.json results.json --threshold 0.1
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+import numpy as np
+
+from loader import load_from_file
+from mesh_refine import refine_uniform
+from solver import HeatEquationSolver, TimeScheme
+
+MESHES = ("p", "std", "stdref", "triangle", "circle", "circle_eye")
+
+#  метрики, по которым ищутся регрессии (больше - хуже)
+METRICS = (
+    "load_s", "load_cached_s", "setup_mesh_s", "setup_boundary_s", "setup_operators_s", "step_s",
+    "setup_peak_mb", "step_peak_mb",
+)
+
+
+def best_time(function: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(function: Callable[[], object]) -> float:
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+def setup_phases(solver: HeatEquationSolver, mesh: tuple[np.ndarray, np.ndarray, np.ndarray]) -> dict[str, float]:
+    """
+    create_volume_decomposition split into its phases, seconds each.
+    """
+    profiler = solver.enable_profiling()
+    solver.create_volume_decomposition(*mesh)
+    solver.disable_profiling()
+    phases = profiler.report()["phases"]
+    return {
+        "setup_mesh_s": phases["build_mesh"]["total_s"],
+        "setup_boundary_s": phases["set_initial_boundary"]["total_s"],
+        "setup_operators_s": phases["build_operators"]["total_s"],
+    }
+
+
+def benchmark_mesh(name: str, level: int, scheme: TimeScheme, steps: int, repeat: int) -> dict:
+    result = {"mesh": name, "refine": level, "scheme": scheme.name}
+    if level == 0:
+        result["load_s"] = best_time(lambda: load_from_file(name, use_cache=False), repeat)
+        load_from_file(name)  # заполняем кэш
+        result["load_cached_s"] = best_time(lambda: load_from_file(name), repeat)
+    mesh = refine_uniform(*load_from_file(name), levels=level) if level else load_from_file(name)
+
+    phases = []
+    for _ in range(repeat):
+        solver = HeatEquationSolver(name, scheme=scheme)
+        phases.append(setup_phases(solver, mesh))
+    for key in phases[0]:
+        result[key] = min(p[key] for p in phases)
+    result["elements"] = solver.element_count
+    result["faces"] = solver.mesh.face_count
+
+    solver.run_physics(1)  # прогрев: факторизации и кэши
+    result["step_s"] = best_time(lambda: solver.run_physics(steps), repeat) / steps
+
+    result["setup_peak_mb"] = peak_memory(lambda: HeatEquationSolver(name, scheme=scheme).create_volume_decomposition(*mesh))
+    result["step_peak_mb"] = peak_memory(lambda: solver.run_physics(steps))
+    return result
+
+
+def run(args: argparse.Namespace) -> None:
+    scheme = TimeScheme[args.scheme]
+    results = []
+    for name in args.meshes:
+        for level in args.refine:
+            result = benchmark_mesh(name, level, scheme, args.steps, args.repeat)
+            results.append(result)
+            print(
+                f"{name:>10} x{4 ** level:<4d} {result['elements']:8d} elements: "
+                f"setup {sum(result[k] for k in ('setup_mesh_s', 'setup_boundary_s', 'setup_operators_s')) * 1e3:9.2f} ms, "
+                f"step {result['step_s'] * 1e3:9.3f} ms, peak {result['setup_peak_mb']:8.1f} MB"
+            )
+    report = {
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "steps": args.steps,
+        "results": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}")
+
+
+def compare(args: argparse.Namespace) -> int:
+    with open(args.baseline) as file:
+        baseline = {(r["mesh"], r["refine"], r["scheme"]): r for r in json.load(file)["results"]}
+    with open(args.current) as file:
+        current = json.load(file)["results"]
+
+    regressions = 0
+    for result in current:
+        key = (result["mesh"], result["refine"], result["scheme"])
+        if key not in baseline:
+            continue
+        for metric in METRICS:
+            if metric not in result or metric not in baseline[key]:
+                continue
+            old, new = baseline[key][metric], result[metric]
+            ratio = new / old if old > 0 else 1
+            if ratio > 1 + args.threshold:
+                regressions += 1
+                flag = "REGRESSION"
+            elif ratio < 1 - args.threshold:
+                flag = "improved"
+            else:
+                continue
+            print(f"{flag:>10} {key[0]} x{4 ** key[1]} {key[2]} {metric}: {old:.4g} -> {new:.4g} ({ratio:.2f}x)")
+    print(f"{regressions} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="benchmark the meshes and write a JSON report")
+    run_parser.add_argument("--meshes", nargs="+", default=list(MESHES), choices=MESHES)
+    run_parser.add_argument("--refine", nargs="+", type=int, default=[0], help="uniform refinement levels")
+    run_parser.add_argument("--scheme", default=TimeScheme.explicit.name, choices=[s.name for s in TimeScheme])
+    run_parser.add_argument("--steps", type=int, default=50)
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--output", default="benchmark_results.json")
+
+    compare_parser = commands.add_parser("compare", help="flag regressions between two JSON reports")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="allowed relative slowdown")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+        return 0
+    return compare(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,180 @@
+import multiprocessing
+import os
+import queue
+import threading
+import traceback
+from typing import Optional, Protocol
+
+import numpy as np
+
+from mesh_arrays import MeshArrays
+
+
+class FrameSink(Protocol):
+    def write(self, u: np.ndarray, iteration: int, time: float) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class NpzFrameSink:
+    """
+    One `frame_<iteration>.npz` file per snapshot with `u`, `iteration` and `time`.
+    """
+
+    def __init__(self, directory: str):
+        self.directory: str = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, u: np.ndarray, iteration: int, time: float) -> None:
+        np.savez(os.path.join(self.directory, f"frame_{iteration:06d}.npz"), u=u, iteration=iteration, time=time)
+
+    def close(self) -> None:
+        pass
+
+
+class AnimationSink:
+    """
+    Renders every snapshot and appends it to a .gif/.mp4 animation.
+
+    The colour scale must be known in advance, so `max_value` is required; the maximum
+    of the boundary temperatures bounds the field of the heat equation.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            mesh: MeshArrays,
+            axes_sizes: tuple[float, float, float, float],
+            max_value: float,
+            fps: int = 15
+    ):
+        self.path: str = path
+        self.points: np.ndarray = np.asarray(mesh.points)
+        self.cell_offsets: np.ndarray = mesh.slot_offsets
+        self.cell_points: np.ndarray = mesh.slot_point
+        self.axes_sizes: tuple[float, float, float, float] = axes_sizes
+        self.max_value: float = max_value
+        self.fps: int = fps
+        #  matplotlib создаётся при первом кадре, уже в потоке/процессе потребителя
+        self._renderer = None
+        self._writer = None
+        self._count: int = 0
+
+    def write(self, u: np.ndarray, iteration: int, time: float) -> None:
+        if self._renderer is None:
+            from plotter import AnimationWriter, FrameRenderer
+
+            vertices = np.split(self.points.T[self.cell_points], self.cell_offsets[1:-1])
+            self._renderer = FrameRenderer(vertices, self.axes_sizes, self.max_value)
+            self._writer = AnimationWriter(self.path, self.fps)
+        self._writer.write(self._renderer.render(u, f"Time {self._count}"))
+        self._count += 1
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _consume(frames, errors, sink: FrameSink) -> None:
+    finished = False
+    try:
+        while True:
+            item = frames.get()
+            if item is None:
+                finished = True
+                break
+            sink.write(*item)
+        sink.close()
+    except BaseException:
+        errors.put(traceback.format_exc())
+        #  освобождаем производителя, заблокированного на полной очереди; после None кадров больше не будет
+        while not finished and frames.get() is not None:
+            pass
+
+
+class FrameExporter:
+    """
+    Hands snapshots of `u` to a sink running in a background thread or process.
+
+    Attach it to a solver with `attach_recorder`; `on_step` copies the field into a bounded
+    queue and returns, so the solver computes the next steps while the sink renders or writes.
+    When the queue is full the solver waits for the sink (backpressure).
+
+    Parameters
+    ----------
+    sink
+        Object with `write(u, iteration, time)` and `close()`; must be picklable if `process` is set.
+    maxsize
+        Number of snapshots waiting in the queue.
+    every
+        Export only steps whose iteration number is a multiple of `every`.
+    process
+        Run the sink in a separate process instead of a thread, so it does not share the GIL with the solver.
+    boundary
+        Also pass a copy of the boundary temperatures of the step to `sink.write` as `bound_u`
+        (e.g. for `xdmf_export.XdmfWriter` with nodal output).
+    """
+
+    def __init__(
+            self,
+            sink: FrameSink,
+            maxsize: int = 8,
+            every: int = 1,
+            process: bool = False,
+            boundary: bool = False
+    ):
+        self.every: int = every
+        self.boundary: bool = boundary
+        self.frame_count: int = 0
+        if process:
+            context = multiprocessing.get_context()
+            self._frames = context.Queue(maxsize)
+            self._errors = context.Queue()
+            self._consumer = context.Process(target=_consume, args=(self._frames, self._errors, sink), daemon=True)
+        else:
+            self._frames = queue.Queue(maxsize)
+            self._errors = queue.Queue()
+            self._consumer = threading.Thread(target=_consume, args=(self._frames, self._errors, sink), daemon=True)
+        self._consumer.start()
+        self._closed: bool = False
+
+    def on_step(self, solver) -> None:
+        if solver.iteration_count % self.every == 0:
+            bound_u = solver.mesh.bound_u if self.boundary else None
+            self.record(solver.u, solver.iteration_count, solver.time, bound_u)
+
+    def record(self, u: np.ndarray, iteration: int = 0, time: float = 0, bound_u: Optional[np.ndarray] = None) -> None:
+        if self._closed:
+            raise RuntimeError("Frame exporter is closed")
+        self._raise_errors()
+        item = (np.array(u, copy=True), iteration, time)
+        if bound_u is not None:
+            item += (np.array(bound_u, copy=True),)
+        self._frames.put(item)
+        self.frame_count += 1
+
+    def close(self) -> None:
+        """
+        Wait until the sink has written every queued snapshot.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._frames.put(None)
+        self._consumer.join()
+        self._raise_errors()
+
+    def _raise_errors(self) -> None:
+        try:
+            error = self._errors.get_nowait()
+        except queue.Empty:
+            return
+        raise RuntimeError(f"Frame sink failed:\n{error}")
+
+    def __enter__(self) -> "FrameExporter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
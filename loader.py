@@ -1,43 +1,340 @@
-def load_from_file(input_file: str) -> tuple[list[list[float | int]], list[list[float | int]], list[list[float | int]]]:
+import hashlib
+import json
+import os
+import warnings
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+CACHE_SUFFIX = ".cache"
+CACHE_VERSION = 2
+CACHE_ARRAYS = ("points", "polys", "bound")
+RAGGED_ARRAYS = ("offsets", "points", "subdomain")
+
+
+@dataclass
+class PolygonCells:
+    """
+    Cells of any vertex count in CSR layout: vertices of cell `e` are `points[offsets[e]:offsets[e + 1]]`.
+
+    Returned by `load_from_file` for meshes with a ##Polygon section; triangle meshes keep
+    the dense `polys` layout (one row per vertex, the last row is the subdomain id).
+    """
+    offsets: np.ndarray  # (element_count + 1,)
+    points: np.ndarray  # (slot_count,) номера вершин с нуля
+    subdomain: np.ndarray  # (element_count,)
+
+    @staticmethod
+    def from_polys(polys) -> "PolygonCells":
+        """
+        Cells of dense `polys` or the argument itself if it is already PolygonCells.
+        """
+        if isinstance(polys, PolygonCells):
+            return polys
+        polys = np.asarray(polys)
+        element_count, vertex_count = polys.shape[1], polys.shape[0] - 1
+        return PolygonCells(
+            offsets=np.arange(element_count + 1, dtype=np.int64) * vertex_count,
+            points=polys[:-1].T.astype(np.int64).reshape(-1),
+            subdomain=polys[-1].astype(np.int64),
+        )
+
+    @property
+    def element_count(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def sizes(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def to_polys(self) -> np.ndarray:
+        """
+        Dense `polys` layout; only for meshes whose cells have the same vertex count.
+        """
+        sizes = self.sizes
+        if len(sizes) and np.any(sizes != sizes[0]):
+            raise ValueError("Cells have different vertex counts, the dense polys layout is not possible")
+        vertex_count = int(sizes[0]) if len(sizes) else 3
+        return np.vstack([self.points.reshape(-1, vertex_count).T, self.subdomain[None]])
+
+
+def load_from_file(input_file: str, use_cache: bool = True) -> tuple[np.ndarray, np.ndarray | PolygonCells, np.ndarray]:
     """
+    Load a mesh exported to `input_file + ".out"`.
 
     Parameters
     ----------
     input_file
+        Path to the mesh without the ".out" extension.
+    use_cache
+        Read the arrays from the binary cache `input_file + ".out.cache"` if it matches the source file,
+        otherwise parse the text file and write the cache.
 
     Returns
     -------
-
+    points, polys and bound; point indices are zero-based. Arrays read from the cache are read-only memory maps.
+    polys is `PolygonCells` for meshes with a ##Polygon section.
     """
+    source = input_file + ".out"
+    if use_cache:
+        cached = load_cache(source)
+        if cached is not None:
+            return cached
+
+    points, polys, bound = parse_out_file(source)
+    if use_cache:
+        save_cache(source, points, polys, bound)
+    return points, polys, bound
+
 
-    lines: list[str] = open(input_file + ".out", mode="r").readlines()
+class MeshFormatError(ValueError):
+    def __init__(self, source: str, line_number: int, message: str):
+        super().__init__(f"{source}:{line_number}: {message}")
+        self.source = source
+        self.line_number = line_number
 
-    row: int = 1
-    points, row = load_matrix(lines, row, float)  # rectangle array
-    row += 1
-    polys, row = load_matrix(lines, row, float)  # rectangle array
-    row += 1
-    bound, row = load_matrix(lines, row, float)  # rectangle array
 
-    for i in range(len(polys)):
-        for j in range(len(polys[i])):
-            polys[i][j] -= 1
+SECTION_HEADERS = ("##Point", "##Triangle", "##Boundary")
+#  вместо ##Triangle может идти ##Polygon: строка числа вершин, строка всех вершин подряд, строка подобластей
+POLYGON_HEADER = "##Polygon"
+#  допустимое число строк секции: (минимум, максимум или None)
+SECTION_ROWS = {"##Point": (2, 2), "##Triangle": (4, None), POLYGON_HEADER: (3, 3), "##Boundary": (6, None)}
+READ_CHUNK_SIZE = 1 << 22  # символов за одно чтение строки
 
-    for i in range(2):
-        for j in range(len(bound[i])):
-            bound[i][j] -= 1
+
+def parse_out_file(source: str) -> tuple[np.ndarray, np.ndarray | PolygonCells, np.ndarray]:
+    """
+    Parse the text export section by section.
+
+    Rows are read in chunks of `READ_CHUNK_SIZE` characters and converted to NumPy arrays
+    without building Python lists of values, so a whole row is never held as a list of floats.
+    """
+    sections: list[np.ndarray] = []
+    with open(source, mode="r") as f:
+        line_number = 0
+        header_line = 0
+        header: Optional[str] = None
+        rows: list[np.ndarray] = []
+        for line_number, row in iter_rows(f, source):
+            if isinstance(row, str):
+                if header is not None:
+                    sections.append(stack_section(source, header_line, header, rows))
+                expected = SECTION_HEADERS[len(sections)] if len(sections) < len(SECTION_HEADERS) else None
+                if row != expected and not (expected == SECTION_HEADERS[1] and row == POLYGON_HEADER):
+                    raise MeshFormatError(source, line_number, f"expected section {expected}, got {row}")
+                header, header_line, rows = row, line_number, []
+            elif header is None:
+                raise MeshFormatError(source, line_number, f"data before section {SECTION_HEADERS[0]}")
+            else:
+                if rows and len(row) != len(rows[0]) and header != POLYGON_HEADER:
+                    raise MeshFormatError(
+                        source, line_number, f"row has {len(row)} values, previous rows of {header} have {len(rows[0])}"
+                    )
+                rows.append(row)
+        if header is not None:
+            sections.append(stack_section(source, header_line, header, rows))
+    if len(sections) != len(SECTION_HEADERS):
+        raise MeshFormatError(source, line_number, f"missing section {SECTION_HEADERS[len(sections)]}")
+
+    points, polys, bound = sections
+    if isinstance(polys, PolygonCells):
+        polys.points -= 1
+        polys.subdomain -= 1
+    else:
+        polys = polys.astype(np.int64)
+        polys -= 1
+    bound[:2] -= 1
 
     return points, polys, bound
 
 
-def load_matrix(lines: list[str], start_row: int, value_type: type = float) -> tuple[list[list[float]], int]:
-    end_row = start_row
-    m = []
-    while end_row < len(lines):
-        line = lines[end_row]
-        if line.startswith("##") or len(line.strip()) == 0:
-            break
-        values = list(map(value_type, line.split()))
-        m.append(values)
-        end_row += 1
-    return m, end_row
+def iter_rows(f, source: str):
+    """
+    Yield (line number, section header) for "##" lines and (line number, values) for data rows.
+    Blank lines are skipped.
+    """
+    line_number = 0
+    while True:
+        chunk = f.readline(READ_CHUNK_SIZE)
+        if not chunk:
+            return
+        line_number += 1
+        if chunk.startswith("##"):
+            while not chunk.endswith("\n"):
+                rest = f.readline(READ_CHUNK_SIZE)
+                if not rest:
+                    break
+                chunk += rest
+            yield line_number, chunk.strip()
+            continue
+
+        parts: list[np.ndarray] = []
+        carry = ""
+        while True:
+            line_end = chunk.endswith("\n")
+            text = carry + chunk
+            if line_end:
+                carry = ""
+            else:
+                #  число могло разорваться на границе чтения
+                cut = max(text.rfind(" "), text.rfind("\t"))
+                text, carry = text[:cut + 1], text[cut + 1:]
+            if text.strip():
+                parts.append(parse_values(source, line_number, text))
+            if line_end:
+                break
+            chunk = f.readline(READ_CHUNK_SIZE)
+            if not chunk:
+                if carry.strip():
+                    parts.append(parse_values(source, line_number, carry))
+                break
+        if parts:
+            yield line_number, parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+
+def parse_values(source: str, line_number: int, text: str) -> np.ndarray:
+    with warnings.catch_warnings():
+        #  np.fromstring only warns and truncates on bad data
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            return np.fromstring(text, dtype=np.float64, sep=" ")
+        except (ValueError, DeprecationWarning):
+            bad = next((token for token in text.split() if not is_number(token)), text.strip()[:32])
+            raise MeshFormatError(source, line_number, f"malformed value {bad!r}") from None
+
+
+def is_number(token: str) -> bool:
+    try:
+        float(token)
+    except ValueError:
+        return False
+    return True
+
+
+def stack_section(source: str, line_number: int, header: str, rows: list[np.ndarray]) -> np.ndarray | PolygonCells:
+    """
+    Array of the section `header` starting at `line_number`.
+    """
+    if not rows:
+        raise MeshFormatError(source, line_number, f"section {header} is empty")
+    least, most = SECTION_ROWS[header]
+    if len(rows) < least or (most is not None and len(rows) > most):
+        expected = f"{least}" if least == most else f"at least {least}"
+        raise MeshFormatError(source, line_number, f"section {header} has {len(rows)} rows, expected {expected}")
+    if header == POLYGON_HEADER:
+        return polygon_section(source, line_number, rows)
+    return np.vstack(rows)
+
+
+def polygon_section(source: str, line_number: int, rows: list[np.ndarray]) -> PolygonCells:
+    sizes, points, subdomain = (row.astype(np.int64) for row in rows)
+    if np.any(sizes < 3):
+        raise MeshFormatError(source, line_number, "a polygon has fewer than 3 vertices")
+    if sizes.sum() != len(points) or len(subdomain) != len(sizes):
+        raise MeshFormatError(
+            source, line_number,
+            f"{len(sizes)} polygons with {sizes.sum()} vertices, got {len(points)} vertices and {len(subdomain)} subdomains"
+        )
+    offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    return PolygonCells(offsets, points, subdomain)
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, mode="rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_dir(source: str) -> str:
+    return source + CACHE_SUFFIX
+
+
+def load_cache(source: str) -> tuple[np.ndarray, np.ndarray, np.ndarray] | None:
+    """
+    Memory map the cached arrays of `source`, or return None if there is no valid cache.
+
+    The cache is valid if it was written from a file with the same size and modification time;
+    if only the time differs (e.g. after a checkout), the content hash decides.
+    """
+    directory = cache_dir(source)
+    try:
+        with open(os.path.join(directory, "meta.json"), mode="r") as f:
+            meta = json.load(f)
+        stat = os.stat(source)
+    except (OSError, ValueError):
+        return None
+
+    if meta.get("version") != CACHE_VERSION or meta.get("size") != stat.st_size:
+        return None
+    if meta.get("mtime_ns") != stat.st_mtime_ns:
+        if meta.get("sha1") != file_digest(source):
+            return None
+        #  содержимое то же: запоминаем новое время, чтобы не хешировать файл при каждой загрузке
+        meta["mtime_ns"] = stat.st_mtime_ns
+        try:
+            write_meta(directory, meta)
+        except OSError:
+            pass
+
+    try:
+        arrays = {
+            name: np.load(os.path.join(directory, name + ".npy"), mmap_mode="r")
+            for name in CACHE_ARRAYS if not (name == "polys" and meta.get("ragged"))
+        }
+        if meta.get("ragged"):
+            arrays["polys"] = PolygonCells(*(
+                np.load(os.path.join(directory, f"polys_{name}.npy"), mmap_mode="r") for name in RAGGED_ARRAYS
+            ))
+        return tuple(arrays[name] for name in CACHE_ARRAYS)
+    except (OSError, ValueError):
+        return None
+
+
+def write_meta(directory: str, meta: dict) -> None:
+    meta_path = os.path.join(directory, "meta.json")
+    temporary = f"{meta_path}.{os.getpid()}.tmp"
+    with open(temporary, mode="w") as f:
+        json.dump(meta, f)
+    os.replace(temporary, meta_path)
+
+
+def save_cache(source: str, points: np.ndarray, polys: np.ndarray | PolygonCells, bound: np.ndarray) -> None:
+    """
+    Write the arrays next to `source`. Every file is written to a temporary name and renamed into place,
+    meta.json last, so an interrupted write leaves no valid cache and memory maps of readers stay intact.
+    """
+    directory = cache_dir(source)
+    stat = os.stat(source)
+    meta = {
+        "version": CACHE_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha1": file_digest(source),
+        "ragged": isinstance(polys, PolygonCells),
+    }
+    try:
+        os.makedirs(directory, exist_ok=True)
+        meta_path = os.path.join(directory, "meta.json")
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        arrays = {"points": points, "bound": bound}
+        if isinstance(polys, PolygonCells):
+            for name in RAGGED_ARRAYS:
+                arrays[f"polys_{name}"] = getattr(polys, name)
+        else:
+            arrays["polys"] = polys
+        #  файлы заменяются целиком: другие процессы могут держать старые отображёнными в память
+        suffix = f".{os.getpid()}.tmp"
+        for name, array in arrays.items():
+            path = os.path.join(directory, name + ".npy")
+            with open(path + suffix, mode="wb") as f:
+                np.save(f, np.ascontiguousarray(array))
+            os.replace(path + suffix, path)
+        write_meta(directory, meta)
+    except OSError:
+        # read-only mesh directory: work without the cache
+        pass
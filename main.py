@@ -1,53 +1,172 @@
-from copy import deepcopy
+"""
+Heat equation on a mesh from a .out file.
 
-import matplotlib.pyplot as plt
-import numpy as np
-from matplotlib import animation
+    python main.py run --mesh circle_eye --steps 256 --output heat_circle_eye_256.gif
+    python main.py run --mesh stdref --steps 1000 --scheme rk4 --hot 300 --output out/stdref.xdmf
+    python main.py batch jobs.json --workers 4 --report summary.json
 
-from loader import load_from_file
-from math_2d import Vector2D
-from plotter import plot_points, plot_polys, plot_elements, create_frame
-from solver import HeatEquationSolver
+Without arguments runs the default job (circle_eye, 256 steps, GIF). The output format follows
+the extension: .gif/.mp4 animation, .xdmf time series, .npz field history; no output by default.
+A batch config is a JSON list of jobs with the options of `run` as keys, or an object
+{"defaults": {...}, "jobs": [...]}.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
 
+START = time.perf_counter()
 
-def scaling_u(elem_per_time: list[tuple[list[Vector2D], list[float]]]) -> float:
-    scale = 256
-    normalize_coefficient = 0
-    for elem in elem_per_time:
-        for u in elem[1]:
-            normalize_coefficient = max(normalize_coefficient, u / scale)
-    return normalize_coefficient
+JOB_DEFAULTS = {
+    "mesh": "circle_eye",
+    "steps": 256,
+    "delta": None,
+    "scheme": "explicit",
+    "hot": None,
+    "boundary": None,
+    "refine": 0,
+    "output": None,
+    "every": 1,
+    "fps": 15,
+}
 
 
-if __name__ == '__main__':
-    filename = "circle_eye"
-    points, polys, bound = load_from_file(filename)
-    min_x, max_x = min(points[0]), max(points[0])
-    min_y, max_y = min(points[1]), max(points[1])
-    fig, ax = plt.subplots()
-    ax.set_xlim(min_x - 0.5, max_x + 0.5)
-    ax.set_ylim(min_y - 0.5, max_y + 0.5)
-    # plot_points(points, ax)
-    # plot_polys(polys, points, ax)
-    # plt.show()
-    # create_surface("p")
+def run_job(job: dict) -> dict:
+    """
+    Run one simulation and write its output; returns the job with its timings.
+    """
+    job = {**JOB_DEFAULTS, **job}
+    started = time.perf_counter()
+    #  тяжёлые модули загружаются только здесь, matplotlib - только при выводе анимации
+    from loader import load_from_file
+    from periodic_boundary import boundary_table
+    from solver import HeatEquationSolver, TimeScheme
+    imported = time.perf_counter()
+
+    mesh = load_from_file(job["mesh"])
+    if job["refine"]:
+        from mesh_refine import refine_uniform
+        mesh = refine_uniform(*mesh, levels=job["refine"])
+    world = HeatEquationSolver(domain=job["mesh"], scheme=TimeScheme[job["scheme"]])
+    world.create_volume_decomposition(*mesh)
+    if job["delta"] is not None:
+        world.set_parameters(job["delta"])
+    if job["boundary"] is not None or job["hot"] is not None:
+        table = boundary_table(job["boundary"]) if job["boundary"] is not None else None
+        world.set_boundary_conditions(table, job["hot"])
+    prepared = time.perf_counter()
+
+    output = job["output"]
+    if output is None:
+        world.run_physics(job["steps"])
+    elif output.endswith((".gif", ".mp4")):
+        from frame_export import AnimationSink, FrameExporter
+        low = world.mesh.points.min(axis=1)
+        high = world.mesh.points.max(axis=1)
+        axes_sizes = (float(low[0]), float(high[0]), float(low[1]), float(high[1]))
+        sink = AnimationSink(output, world.mesh, axes_sizes, float(world.mesh.bound_u.max()), job["fps"])
+        #  кадры рисуются в отдельном процессе, пока считаются следующие шаги;
+        #  в пуле batch процессы не могут порождать свои, там рисует поток
+        process = not multiprocessing.current_process().daemon
+        with FrameExporter(sink, maxsize=16, every=job["every"], process=process) as exporter:
+            world.attach_recorder(exporter)
+            world.run_physics(job["steps"])
+    elif output.endswith(".xdmf"):
+        from xdmf_export import XdmfWriter
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with XdmfWriter(output, world.mesh, every=job["every"]) as writer:
+            world.attach_recorder(writer)
+            world.run_physics(job["steps"])
+    elif output.endswith(".npz"):
+        from recorder import FieldRecorder
+        recorder = FieldRecorder(world.mesh, capacity=job["steps"] // job["every"] + 1, every=job["every"])
+        world.attach_recorder(recorder)
+        world.run_physics(job["steps"])
+        recorder.save(output)
+    else:
+        raise ValueError(f"Unsupported output format: {output}")
+    finished = time.perf_counter()
+
+    return {
+        **job,
+        "elements": world.element_count,
+        "imports_s": imported - started,
+        "setup_s": prepared - imported,
+        "run_s": finished - prepared,
+        "total_s": finished - started,
+        "matplotlib_loaded": "matplotlib" in sys.modules,
+    }
+
 
+def job_line(result: dict) -> str:
+    return (
+        f"{result['mesh']} x{4 ** result['refine']} {result['scheme']}: {result['elements']} elements, "
+        f"{result['steps']} steps, setup {result['setup_s']:.3f} s, run {result['run_s']:.3f} s"
+        + (f" -> {result['output']}" if result["output"] else "")
+    )
 
-    world = HeatEquationSolver(domain=filename)
-    world.create_volume_decomposition(points, polys, bound)
 
-    count_times = 256
+def add_job_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--mesh", default=JOB_DEFAULTS["mesh"], help="name of the .out file without extension")
+    parser.add_argument("--steps", type=int, default=JOB_DEFAULTS["steps"])
+    parser.add_argument("--delta", type=float, default=None, help="time step, 0.015 by default")
+    parser.add_argument("--scheme", default=JOB_DEFAULTS["scheme"],
+                        help="explicit, jacobi, ssp_rk2, ssp_rk3, rk4, backward_euler or crank_nicolson")
+    parser.add_argument("--hot", type=float, default=None, help="hot boundary temperature instead of the domain one")
+    parser.add_argument("--boundary", default=None, help="use the boundary table registered for another domain")
+    parser.add_argument("--refine", type=int, default=0, help="uniform refinement levels")
+    parser.add_argument("--output", default=None, help=".gif, .mp4, .xdmf or .npz")
+    parser.add_argument("--every", type=int, default=1, help="write every n-th step")
+    parser.add_argument("--fps", type=int, default=JOB_DEFAULTS["fps"])
 
-    elem_per_time: list[tuple[list[Vector2D], list[float]]] = [[] for _ in range(count_times)]
-    for t in range(count_times):
-        world.run_physics()
 
-        plot_elements(world.elements, ax)
-        vertices = [deepcopy(elem.vertex) for elem in world.elements]
-        u = [elem.u for elem in world.elements]
-        elem_per_time[t] = (vertices, u)
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run one simulation")
+    add_job_arguments(run_parser)
+    run_parser.add_argument("--timings", action="store_true", help="print timings of the job as JSON")
+    batch_parser = commands.add_parser("batch", help="run the jobs of a JSON config in a worker pool")
+    batch_parser.add_argument("config")
+    batch_parser.add_argument("--workers", type=int, default=os.cpu_count())
+    batch_parser.add_argument("--report", default=None, help="write the results of all jobs as JSON")
 
-    norm_coeff = scaling_u(elem_per_time)
-    ani = animation.FuncAnimation(fig, create_frame, fargs=[elem_per_time, norm_coeff, ax, (min_x, max_x, min_y, max_y)], frames=count_times)
-    ani.save(f'heat_{filename}_{count_times}.gif', writer='pillow', fps=15)
+    if not argv:
+        argv = ["run", "--output", f"heat_{JOB_DEFAULTS['mesh']}_{JOB_DEFAULTS['steps']}.gif"]
+    args = parser.parse_args(argv)
 
+    if args.command == "run":
+        job = {name: getattr(args, name) for name in JOB_DEFAULTS}
+        parsed = time.perf_counter()
+        result = run_job(job)
+        result["startup_s"] = parsed - START
+        print(job_line(result))
+        if args.timings:
+            print(json.dumps(result, indent=2))
+        return 0
+
+    with open(args.config) as file:
+        config = json.load(file)
+    defaults = config.get("defaults", dict()) if isinstance(config, dict) else dict()
+    jobs = [{**defaults, **job} for job in (config["jobs"] if isinstance(config, dict) else config)]
+    unknown = {key for job in jobs for key in job} - set(JOB_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown job options: {', '.join(sorted(unknown))}")
+
+    started = time.perf_counter()
+    results = []
+    with multiprocessing.get_context().Pool(min(args.workers, len(jobs)) or 1) as pool:
+        for result in pool.imap_unordered(run_job, jobs):
+            results.append(result)
+            print(job_line(result))
+    print(f"{len(results)} jobs in {time.perf_counter() - started:.3f} s")
+    if args.report is not None:
+        with open(args.report, "w") as file:
+            json.dump(results, file, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -1,75 +1,257 @@
+import math
 from typing import Union
 
 import numpy as np
-from numpy.linalg import norm
+
+_SCALAR_TYPES = (int, float, np.number)
 
 
 class Vector2D:
+    __slots__ = ("x", "y")
+
     def __init__(self, x: float | np.float64, y: float | np.float64):
-        self.data: np.ndarray[np.float64] = np.array([x, y], dtype=np.float64)
+        self.x: float = float(x)
+        self.y: float = float(y)
+
+    @property
+    def data(self) -> np.ndarray:
+        """
+        Read-only copy of the coordinates; change the vector through `x`, `y` or indexing.
+        """
+        data = np.array([self.x, self.y], dtype=np.float64)
+        data.flags.writeable = False  # запись в копию потерялась бы молча
+        return data
+
+    @staticmethod
+    def _unsupported(operation: str, other):
+        #  смешанные выражения с Vector2DArray вычисляет он сам
+        if isinstance(other, Vector2DArray):
+            return NotImplemented
+        raise ValueError(f"Cannot {operation} Vector2D and {type(other).__name__}")
 
     def clone(self) -> "Vector2D":
-        return Vector2D(self.data[0], self.data[1])
+        return Vector2D(self.x, self.y)
 
-    def __getitem__(self, i: int) -> np.float64:
-        return self.data[i]
+    def __getitem__(self, i: int) -> float:
+        if i == 0 or i == -2:
+            return self.x
+        if i == 1 or i == -1:
+            return self.y
+        raise IndexError(f"Vector2D index {i} out of range")
 
     def __setitem__(self, key: int, value: float | np.float64):
-        self.data[key] = value
+        if key == 0 or key == -2:
+            self.x = float(value)
+        elif key == 1 or key == -1:
+            self.y = float(value)
+        else:
+            raise IndexError(f"Vector2D index {key} out of range")
+
+    def __iter__(self):
+        yield self.x
+        yield self.y
+
+    def __repr__(self) -> str:
+        return f"Vector2D({self.x}, {self.y})"
+
+    def length(self) -> float:
+        return math.hypot(self.x, self.y)
 
     def __len__(self) -> float:
-        return np.sqrt(np.sum(self.data ** 2))
+        return math.hypot(self.x, self.y)
 
     def get_normalize(self) -> "Vector2D":
-        new_data = self.data / np.sqrt(np.sum(self.data ** 2))
-        return Vector2D(new_data[0], new_data[1])
+        length = math.hypot(self.x, self.y)
+        return Vector2D(self.x / length, self.y / length)
 
     def normalize(self):
-        self.data = self.data / np.sqrt(np.sum(self.data ** 2))
+        length = math.hypot(self.x, self.y)
+        self.x /= length
+        self.y /= length
 
     def __mul__(self, other) -> Union["Vector2D", float]:
-        if isinstance(other, (int, float)):
-            return Vector2D(self.data[0] * other, self.data[1] * other)
+        if isinstance(other, _SCALAR_TYPES):
+            return Vector2D(self.x * other, self.y * other)
         if isinstance(other, Vector2D):
-            return self.data[0] * other.data[0] + self.data[1] * other.data[1]
-        raise ValueError(f"Cannot multiply Vector2d with {type(other)}")
+            return self.x * other.x + self.y * other.y
+        return self._unsupported("multiply", other)
+
+    def __rmul__(self, other) -> "Vector2D":
+        if isinstance(other, _SCALAR_TYPES):
+            return Vector2D(self.x * other, self.y * other)
+        return NotImplemented
 
     def __add__(self, other) -> "Vector2D":
-        if isinstance(other, (int, float)):
-            return Vector2D(self.data[0] + other, self.data[1] + other)
+        if isinstance(other, _SCALAR_TYPES):
+            return Vector2D(self.x + other, self.y + other)
         if isinstance(other, Vector2D):
-            return Vector2D(self.data[0] + other.data[0], self.data[1] + other.data[1])
-        raise ValueError(f"Cannot summary Vector2d with {type(other)}")
+            return Vector2D(self.x + other.x, self.y + other.y)
+        return self._unsupported("add", other)
 
     def __sub__(self, other) -> "Vector2D":
-        if isinstance(other, (int, float)):
-            return Vector2D(self.data[0] - other, self.data[1] - other)
+        if isinstance(other, _SCALAR_TYPES):
+            return Vector2D(self.x - other, self.y - other)
         if isinstance(other, Vector2D):
-            return Vector2D(self.data[0] - other.data[0], self.data[1] - other.data[1])
-        raise ValueError(f"Cannot substract Vector2d with {type(other)}")
+            return Vector2D(self.x - other.x, self.y - other.y)
+        return self._unsupported("subtract", other)
 
     def __truediv__(self, other) -> "Vector2D":
-        if isinstance(other, (int, float)):
-            return Vector2D(self.data[0] / other, self.data[1] / other)
+        if isinstance(other, _SCALAR_TYPES):
+            return Vector2D(self.x / other, self.y / other)
         if isinstance(other, Vector2D):
-            return Vector2D(self.data[0] / other.data[0], self.data[1] / other.data[1])
-        raise ValueError(f"Cannot substract Vector2d with {type(other)}")
+            return Vector2D(self.x / other.x, self.y / other.y)
+        return self._unsupported("divide", other)
+
+    def __iadd__(self, other) -> "Vector2D":
+        if isinstance(other, _SCALAR_TYPES):
+            self.x += other
+            self.y += other
+        elif isinstance(other, Vector2D):
+            self.x += other.x
+            self.y += other.y
+        else:
+            return NotImplemented
+        return self
+
+    def __isub__(self, other) -> "Vector2D":
+        if isinstance(other, _SCALAR_TYPES):
+            self.x -= other
+            self.y -= other
+        elif isinstance(other, Vector2D):
+            self.x -= other.x
+            self.y -= other.y
+        else:
+            return NotImplemented
+        return self
+
+    def __imul__(self, other) -> "Vector2D":
+        if isinstance(other, _SCALAR_TYPES):
+            self.x *= other
+            self.y *= other
+            return self
+        return NotImplemented
+
+    def __itruediv__(self, other) -> "Vector2D":
+        if isinstance(other, _SCALAR_TYPES):
+            self.x /= other
+            self.y /= other
+        elif isinstance(other, Vector2D):
+            self.x /= other.x
+            self.y /= other.y
+        else:
+            return NotImplemented
+        return self
 
     def __neg__(self) -> "Vector2D":
         return Vector2D(-self.x, -self.y)
 
-    @property
-    def x(self) -> np.float64:
-        return self.data[0]
+
+class Vector2DArray:
+    """
+    N vectors stored as two coordinate arrays. Supports the arithmetic of Vector2D elementwise,
+    so Geometry2D functions work on one vector or on N vectors at once.
+    """
+    __slots__ = ("x", "y")
+
+    def __init__(self, x: np.ndarray | list[float], y: np.ndarray | list[float]):
+        self.x: np.ndarray = np.asarray(x, dtype=np.float64)
+        self.y: np.ndarray = np.asarray(y, dtype=np.float64)
+
+    @staticmethod
+    def from_vectors(vectors: list[Vector2D]) -> "Vector2DArray":
+        return Vector2DArray([v.x for v in vectors], [v.y for v in vectors])
 
     @property
-    def y(self) -> np.float64:
-        return self.data[1]
+    def data(self) -> np.ndarray:
+        return np.stack([self.x, self.y], axis=1)
+
+    def clone(self) -> "Vector2DArray":
+        return Vector2DArray(self.x.copy(), self.y.copy())
+
+    def __getitem__(self, i: int) -> Vector2D:
+        return Vector2D(self.x[i], self.y[i])
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def __iter__(self):
+        for x, y in zip(self.x.tolist(), self.y.tolist()):
+            yield Vector2D(x, y)
+
+    def length(self) -> np.ndarray:
+        return np.hypot(self.x, self.y)
+
+    def get_normalize(self) -> "Vector2DArray":
+        length = np.hypot(self.x, self.y)
+        return Vector2DArray(self.x / length, self.y / length)
+
+    def normalize(self):
+        length = np.hypot(self.x, self.y)
+        self.x /= length
+        self.y /= length
+
+    def __mul__(self, other) -> Union["Vector2DArray", np.ndarray]:
+        if isinstance(other, (Vector2D, Vector2DArray)):
+            return self.x * other.x + self.y * other.y
+        return Vector2DArray(self.x * other, self.y * other)
+
+    def __rmul__(self, other) -> Union["Vector2DArray", np.ndarray]:
+        return self.__mul__(other)
+
+    def __add__(self, other) -> "Vector2DArray":
+        if isinstance(other, (Vector2D, Vector2DArray)):
+            return Vector2DArray(self.x + other.x, self.y + other.y)
+        return Vector2DArray(self.x + other, self.y + other)
+
+    def __radd__(self, other) -> "Vector2DArray":
+        return self.__add__(other)
+
+    def __sub__(self, other) -> "Vector2DArray":
+        if isinstance(other, (Vector2D, Vector2DArray)):
+            return Vector2DArray(self.x - other.x, self.y - other.y)
+        return Vector2DArray(self.x - other, self.y - other)
+
+    def __rsub__(self, other) -> "Vector2DArray":
+        return -self.__sub__(other)
+
+    def __truediv__(self, other) -> "Vector2DArray":
+        if isinstance(other, (Vector2D, Vector2DArray)):
+            return Vector2DArray(self.x / other.x, self.y / other.y)
+        return Vector2DArray(self.x / other, self.y / other)
+
+    def __iadd__(self, other) -> "Vector2DArray":
+        if isinstance(other, (Vector2D, Vector2DArray)):
+            self.x = self.x + other.x
+            self.y = self.y + other.y
+        else:
+            self.x = self.x + other
+            self.y = self.y + other
+        return self
+
+    def __itruediv__(self, other) -> "Vector2DArray":
+        if isinstance(other, (Vector2D, Vector2DArray)):
+            self.x = self.x / other.x
+            self.y = self.y / other.y
+        else:
+            self.x = self.x / other
+            self.y = self.y / other
+        return self
+
+    def __neg__(self) -> "Vector2DArray":
+        return Vector2DArray(-self.x, -self.y)
+
+
+AnyVector2D = Vector2D | Vector2DArray
+
 
 class Geometry2D:
+    """
+    Functions accept either Vector2D or Vector2DArray arguments; with Vector2DArray every
+    value is computed for N shapes at once.
+    """
 
     @staticmethod
-    def triangle_area(v1: Vector2D, v2: Vector2D, v3: Vector2D) -> float:
+    def triangle_area(v1: AnyVector2D, v2: AnyVector2D, v3: AnyVector2D) -> float | np.ndarray:
         triarea = abs(
             v1.x * (v2.y - v3.y) +
             v2.x * (v3.y - v1.y) +
@@ -78,52 +260,60 @@ class Geometry2D:
         return triarea
 
     @staticmethod
-    def triangle_center(v1: Vector2D, v2: Vector2D, v3: Vector2D) -> Vector2D:
+    def triangle_center(v1: AnyVector2D, v2: AnyVector2D, v3: AnyVector2D) -> AnyVector2D:
         return (v1 + v2 + v3) / 3
 
     @staticmethod
-    def line_normal(v1: Vector2D, v2: Vector2D) -> Vector2D:
-        diff = v2 - v1
-        return Vector2D(diff.y, -diff.x).get_normalize()
+    def line_normal(v1: AnyVector2D, v2: AnyVector2D) -> AnyVector2D:
+        return Geometry2D.surface_normal(v1, v2).get_normalize()
 
     @staticmethod
-    def surface_normal(v1: Vector2D, v2: Vector2D) -> Vector2D:
+    def surface_normal(v1: AnyVector2D, v2: AnyVector2D) -> AnyVector2D:
         diff = v2 - v1
-        return Vector2D(diff.y, -diff.x)
+        return type(diff)(diff.y, -diff.x)
 
     @staticmethod
-    def polygon_centroid(vertex: list[Vector2D]) -> Vector2D:
-        poly_geom_center = Vector2D(0, 0)
-        for v in vertex:
+    def polygon_geom_center(vertex: list[AnyVector2D]) -> AnyVector2D:
+        poly_geom_center = vertex[0].clone()
+        for v in vertex[1:]:
             poly_geom_center += v
         poly_geom_center /= len(vertex)
+        return poly_geom_center
 
-        polygon_center = Vector2D(0, 0)
-        polygon_area = 0
+    @staticmethod
+    def polygon_centroid(vertex: list[AnyVector2D]) -> AnyVector2D:
+        return Geometry2D.polygon_centroid_area(vertex)[0]
+
+    @staticmethod
+    def polygon_area(vertex: list[AnyVector2D]) -> float | np.ndarray:
+        poly_geom_center = Geometry2D.polygon_geom_center(vertex)
 
+        polygon_area = 0
         for i in range(len(vertex)):
             v1 = vertex[i]
             v2 = vertex[(i + 1) % len(vertex)]
-            triangle_geom_center = Geometry2D.triangle_center(v1, v2, poly_geom_center)
             triarea = Geometry2D.triangle_area(v1, v2, poly_geom_center)
             polygon_area += triarea
-            polygon_center += triangle_geom_center * triarea
-
-        polygon_center /= polygon_area
-
-        return polygon_center
+        return polygon_area
 
     @staticmethod
-    def polygon_area(vertex: list[Vector2D]) -> float:
-        poly_geom_center = Vector2D(0, 0)
-        for v in vertex:
-            poly_geom_center += v
-        poly_geom_center /= len(vertex)
+    def polygon_centroid_area(vertex: list[AnyVector2D]) -> tuple[AnyVector2D, float | np.ndarray]:
+        poly_geom_center = Geometry2D.polygon_geom_center(vertex)
 
+        polygon_center = None
         polygon_area = 0
+
         for i in range(len(vertex)):
             v1 = vertex[i]
             v2 = vertex[(i + 1) % len(vertex)]
+            triangle_geom_center = Geometry2D.triangle_center(v1, v2, poly_geom_center)
             triarea = Geometry2D.triangle_area(v1, v2, poly_geom_center)
             polygon_area += triarea
-        return polygon_area
+            if polygon_center is None:
+                polygon_center = triangle_geom_center * triarea
+            else:
+                polygon_center += triangle_geom_center * triarea
+
+        polygon_center /= polygon_area
+
+        return polygon_center, polygon_area
@@ -0,0 +1,456 @@
+from dataclasses import dataclass, fields
+from enum import Enum
+
+import numpy as np
+from scipy.sparse import csr_array
+
+from element import Element, Face, BoundaryType
+from loader import PolygonCells
+from math_2d import Geometry2D, Vector2D, Vector2DArray
+
+
+class NodeWeights(Enum):
+    inverse_distance = 0  # обратное расстояние от вершины до центра элемента
+    area = 1  # площадь элемента
+
+
+@dataclass
+class MeshArrays:
+    """
+    Struct-of-arrays form of the finite volume decomposition.
+
+    Every (element, local face) pair is a "slot". Slots are stored element by element,
+    so slots of element `e` occupy `slot_offsets[e]:slot_offsets[e + 1]`.
+    Slot `s` is the face from vertex `slot_point[s]` to the vertex of the next slot of the element.
+    """
+    element_count: int
+    face_count: int
+    points: np.ndarray  # (2, point_count)
+    centroid: np.ndarray  # (element_count, 2)
+    volume: np.ndarray  # (element_count,)
+    k: np.ndarray  # (element_count,) теплопроводность
+    slot_offsets: np.ndarray  # (element_count + 1,)
+    slot_cell: np.ndarray  # (slot_count,) элемент-владелец слота
+    slot_point: np.ndarray  # (slot_count,) первая вершина грани в обходе элемента
+    slot_face: np.ndarray  # (slot_count,) глобальный номер грани
+    slot_neighbour: np.ndarray  # (slot_count,) сосед через грань или -1
+    slot_flux: np.ndarray  # (slot_count,)
+    slot_boundary: np.ndarray  # (slot_count,) bool
+    face_points: np.ndarray  # (face_count, 2) вершины в обходе владельца
+    face_owner: np.ndarray  # (face_count,)
+    face_neighbour: np.ndarray  # (face_count,) -1 для граничных граней
+    face_boundary: np.ndarray  # (face_count,) bool
+    face_centroid: np.ndarray  # (face_count, 2)
+    face_sf: np.ndarray  # (face_count, 2) нормаль длины грани, вне владельца
+    face_area: np.ndarray  # (face_count,)
+    bound_face: np.ndarray  # (bound_count,) грани в порядке секции ##Boundary
+    bound_domain: np.ndarray  # (bound_count,)
+    bound_group: np.ndarray  # (bound_count,)
+    bound_u: np.ndarray  # (face_count,) температура на граничных гранях
+
+    @staticmethod
+    def from_polygons(
+            points: list[list[float | int]] | np.ndarray,
+            polys: list[list[float | int]] | np.ndarray | PolygonCells,
+            bound: list[list[float | int]] | np.ndarray,
+            k: float = 1
+    ) -> "MeshArrays":
+        """
+        Build the decomposition for all elements at once.
+
+        Parameters
+        ----------
+        points
+            Rows x and y of the mesh vertices.
+        polys
+            One row per polygon vertex (zero-based point indices), the last row is the subdomain id;
+            or `loader.PolygonCells` for meshes with different polygon sizes.
+        bound
+            Rows of the ##Boundary section, zero-based point indices in the first two rows.
+        k
+            Conductivity of every element.
+        """
+        points = np.asarray(points, dtype=np.float64)[:2]
+        cells = PolygonCells.from_polys(polys)
+        element_count = cells.element_count
+        sizes = cells.sizes
+
+        slot_offsets = np.asarray(cells.offsets, dtype=np.int64)
+        slot_cell = np.repeat(np.arange(element_count, dtype=np.int64), sizes)
+        slot_point = np.asarray(cells.points, dtype=np.int64)
+        slot_index = np.arange(len(slot_point), dtype=np.int64)
+        slot_next = np.where(slot_index + 1 == slot_offsets[slot_cell + 1], slot_offsets[slot_cell], slot_index + 1)
+        slot_next_point = slot_point[slot_next]
+
+        #  центры и площади считаются отдельно для элементов каждого числа вершин
+        centroid = np.empty((element_count, 2), dtype=np.float64)
+        volume = np.empty(element_count, dtype=np.float64)
+        for vertex_count in np.unique(sizes):
+            elements = np.flatnonzero(sizes == vertex_count)
+            cell_points = slot_point[slot_offsets[elements][:, None] + np.arange(vertex_count)]
+            cell_vertex = [
+                Vector2DArray(points[0][cell_points[:, v]], points[1][cell_points[:, v]]) for v in range(vertex_count)
+            ]
+            cell_centroid, cell_volume = Geometry2D.polygon_centroid_area(cell_vertex)
+            centroid[elements] = cell_centroid.data
+            volume[elements] = cell_volume
+
+        #  грани нумеруются в порядке первого появления, владелец - первый элемент с этой гранью
+        point_count = points.shape[1]
+        edge_keys = np.minimum(slot_point, slot_next_point) * point_count + np.maximum(slot_point, slot_next_point)
+        unique_keys, first_slot, inverse, counts = np.unique(
+            edge_keys, return_index=True, return_inverse=True, return_counts=True
+        )
+        if np.any(counts > 2):
+            raise ValueError("Mesh is not manifold: an edge is shared by more than two elements")
+        order = np.argsort(first_slot, kind="stable")
+        face_of_unique = np.empty_like(order)
+        face_of_unique[order] = np.arange(len(order))
+        slot_face = face_of_unique[inverse.reshape(-1)]
+        owner_slot = first_slot[order]
+        face_count = len(order)
+
+        face_owner = slot_cell[owner_slot]
+        face_neighbour = np.full(face_count, -1, dtype=np.int64)
+        second_slot = np.ones(len(slot_face), dtype=bool)
+        second_slot[owner_slot] = False
+        face_neighbour[slot_face[second_slot]] = slot_cell[second_slot]
+        slot_neighbour = np.where(second_slot, face_owner[slot_face], face_neighbour[slot_face])
+
+        face_points = np.stack([slot_point[owner_slot], slot_next_point[owner_slot]], axis=1)
+        v1 = Vector2DArray(points[0][face_points[:, 0]], points[1][face_points[:, 0]])
+        v2 = Vector2DArray(points[0][face_points[:, 1]], points[1][face_points[:, 1]])
+        face_sf = Geometry2D.surface_normal(v1, v2).data
+        face_area = (v1 - v2).length()
+        face_centroid = ((v1 + v2) / 2).data
+
+        bound = np.asarray(bound, dtype=np.float64)
+        bound_p1 = bound[0].astype(np.int64)
+        bound_p2 = bound[1].astype(np.int64)
+        bound_keys = np.minimum(bound_p1, bound_p2) * point_count + np.maximum(bound_p1, bound_p2)
+        bound_unique = np.minimum(np.searchsorted(unique_keys, bound_keys), len(unique_keys) - 1)
+        if np.any(unique_keys[bound_unique] != bound_keys):
+            raise ValueError("Boundary section references an edge that is not a face of the mesh")
+        bound_face = face_of_unique[bound_unique]
+        face_boundary = np.zeros(face_count, dtype=bool)
+        face_boundary[bound_face] = True
+        slot_boundary = face_boundary[slot_face]
+
+        cell_k = np.full(element_count, k, dtype=np.float64)
+        slot_flux = face_flux_coefficients(
+            face_sf[slot_face], face_centroid[slot_face] - centroid[slot_cell], cell_k[slot_cell], slot_boundary
+        )
+
+        return MeshArrays(
+            element_count=element_count,
+            face_count=face_count,
+            points=points,
+            centroid=centroid,
+            volume=volume,
+            k=cell_k,
+            slot_offsets=slot_offsets,
+            slot_cell=slot_cell,
+            slot_point=slot_point,
+            slot_face=slot_face,
+            slot_neighbour=slot_neighbour,
+            slot_flux=slot_flux,
+            slot_boundary=slot_boundary,
+            face_points=face_points,
+            face_owner=face_owner,
+            face_neighbour=face_neighbour,
+            face_boundary=face_boundary,
+            face_centroid=face_centroid,
+            face_sf=face_sf,
+            face_area=face_area,
+            bound_face=bound_face,
+            bound_domain=bound[5].astype(np.int64),
+            bound_group=bound[4].astype(np.int64),
+            bound_u=np.zeros(face_count, dtype=np.float64),
+        )
+
+    def permute(self, order: np.ndarray) -> "MeshArrays":
+        """
+        The same mesh with elements renumbered, element `order[i]` becomes element `i`.
+
+        Slots follow the new element order and faces are renumbered in order of first appearance
+        with the first element as owner, so the result equals `from_polygons` of the permuted polygons.
+        """
+        order = np.asarray(order, dtype=np.int64)
+        new_of_old = np.empty_like(order)
+        new_of_old[order] = np.arange(len(order))
+
+        sizes = np.diff(self.slot_offsets)[order]
+        slot_offsets = np.zeros(len(order) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=slot_offsets[1:])
+        slot_old = np.arange(slot_offsets[-1]) + np.repeat(self.slot_offsets[order] - slot_offsets[:-1], sizes)
+
+        old_face = self.slot_face[slot_old]
+        _, first_slot = np.unique(old_face, return_index=True)
+        owner_slot = np.sort(first_slot)
+        face_order = old_face[owner_slot]  # старый номер каждой новой грани
+        face_new_of_old = np.empty_like(face_order)
+        face_new_of_old[face_order] = np.arange(len(face_order))
+
+        slot_cell = np.repeat(np.arange(len(order), dtype=np.int64), sizes)
+        slot_neighbour = self.slot_neighbour[slot_old]
+        slot_neighbour = np.where(slot_neighbour >= 0, new_of_old[np.maximum(slot_neighbour, 0)], -1)
+
+        #  грань, у которой первым теперь встречается сосед, меняет владельца и ориентацию
+        face_owner = slot_cell[owner_slot]
+        swapped = face_owner != new_of_old[self.face_owner[face_order]]
+        face_neighbour = np.where(
+            self.face_neighbour[face_order] >= 0, new_of_old[np.maximum(self.face_neighbour[face_order], 0)], -1
+        )
+        face_neighbour = np.where(swapped, new_of_old[self.face_owner[face_order]], face_neighbour)
+        face_points = self.face_points[face_order]
+        face_points = np.where(swapped[:, None], face_points[:, ::-1], face_points)
+        face_sf = np.where(swapped[:, None], -self.face_sf[face_order], self.face_sf[face_order])
+
+        return MeshArrays(
+            element_count=self.element_count,
+            face_count=self.face_count,
+            points=self.points,
+            centroid=self.centroid[order],
+            volume=self.volume[order],
+            k=self.k[order],
+            slot_offsets=slot_offsets,
+            slot_cell=slot_cell,
+            slot_point=self.slot_point[slot_old],
+            slot_face=face_new_of_old[old_face],
+            slot_neighbour=slot_neighbour,
+            slot_flux=self.slot_flux[slot_old],
+            slot_boundary=self.slot_boundary[slot_old],
+            face_points=face_points,
+            face_owner=face_owner,
+            face_neighbour=face_neighbour,
+            face_boundary=self.face_boundary[face_order],
+            face_centroid=self.face_centroid[face_order],
+            face_sf=face_sf,
+            face_area=self.face_area[face_order],
+            bound_face=face_new_of_old[self.bound_face],
+            bound_domain=self.bound_domain,
+            bound_group=self.bound_group,
+            bound_u=self.bound_u[face_order],
+        )
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """
+        All fields as arrays, e.g. for np.savez; `from_arrays` restores the mesh.
+        """
+        return {field.name: np.asarray(getattr(self, field.name)) for field in fields(self)}
+
+    @staticmethod
+    def from_arrays(arrays) -> "MeshArrays":
+        values = dict()
+        for field in fields(MeshArrays):
+            value = np.asarray(arrays[field.name])
+            values[field.name] = int(value) if field.type is int else value
+        return MeshArrays(**values)
+
+    @property
+    def slot_count(self) -> int:
+        return int(self.slot_offsets[-1])
+
+    @property
+    def slot_interior(self) -> np.ndarray:
+        return ~self.slot_boundary & (self.slot_neighbour >= 0)
+
+    def diagonal(self) -> np.ndarray:
+        """
+        Coefficient `ac` of `calc`: boundary fluxes plus minus interior fluxes.
+        """
+        coeff = np.where(self.slot_boundary, self.slot_flux, 0.0)
+        interior = self.slot_interior
+        coeff[interior] = -self.slot_flux[interior]
+        return np.bincount(self.slot_cell, weights=coeff, minlength=self.element_count)
+
+    def boundary_source(self, bound_u: np.ndarray | None = None) -> np.ndarray:
+        """
+        Coefficient `bc` of `calc`: sum of boundary fluxes times boundary temperature.
+        """
+        if bound_u is None:
+            bound_u = self.bound_u
+        boundary = self.slot_boundary
+        return np.bincount(
+            self.slot_cell[boundary],
+            weights=self.slot_flux[boundary] * bound_u[self.slot_face[boundary]],
+            minlength=self.element_count
+        )
+
+    def boundary_matrix(self) -> csr_array:
+        """
+        Sparse matrix of boundary fluxes, (row = element, column = face); `boundary_source` as a matrix.
+        """
+        boundary = self.slot_boundary
+        return csr_array(
+            (self.slot_flux[boundary], (self.slot_cell[boundary], self.slot_face[boundary])),
+            shape=(self.element_count, self.face_count)
+        )
+
+    def neighbour_matrix(self, mask: np.ndarray | None = None) -> csr_array:
+        """
+        Sparse matrix of interior fluxes, (row = element, column = neighbour).
+        `mask` restricts the matrix to a subset of slots.
+        """
+        selected = self.slot_interior
+        if mask is not None:
+            selected = selected & mask
+        return csr_array(
+            (self.slot_flux[selected], (self.slot_cell[selected], self.slot_neighbour[selected])),
+            shape=(self.element_count, self.element_count)
+        )
+
+    def node_matrix(self, weights: NodeWeights = NodeWeights.inverse_distance) -> csr_array:
+        """
+        Interpolation from element values to mesh vertices, (row = point, column = element);
+        every row is a weighted mean over the elements sharing the vertex, rows of unused points are empty.
+        """
+        points = np.asarray(self.points)
+        if weights == NodeWeights.inverse_distance:
+            distance = np.hypot(*(points[:, self.slot_point] - self.centroid[self.slot_cell].T))
+            weight = 1 / np.maximum(distance, np.finfo(np.float64).tiny)
+        else:
+            weight = np.abs(self.volume[self.slot_cell])
+        total = np.bincount(self.slot_point, weights=weight, minlength=points.shape[1])
+        return csr_array(
+            (weight / total[self.slot_point], (self.slot_point, self.slot_cell)),
+            shape=(points.shape[1], self.element_count)
+        )
+
+    def node_boundary_matrix(self) -> tuple[csr_array, np.ndarray]:
+        """
+        Mean temperature of the boundary faces at every vertex, (row = point, column = face),
+        and the mask of boundary vertices.
+        """
+        point_count = np.asarray(self.points).shape[1]
+        faces = np.repeat(self.bound_face, 2)
+        rows = self.face_points[faces, np.tile([0, 1], len(self.bound_face))]
+        count = np.bincount(rows, minlength=point_count).astype(np.float64)
+        matrix = csr_array((1 / count[rows], (rows, faces)), shape=(point_count, self.face_count))
+        return matrix, count > 0
+
+    def set_node_boundary(
+            self,
+            values: np.ndarray,
+            node_boundary: tuple[csr_array, np.ndarray] | None = None,
+            bound_u: np.ndarray | None = None
+    ) -> np.ndarray:
+        """
+        Replace the vertex values on the boundary in place by the mean temperature of their boundary faces.
+
+        `node_boundary` is the result of `node_boundary_matrix` (built if not given),
+        `bound_u` the boundary temperatures (`self.bound_u` if not given).
+        """
+        matrix, mask = self.node_boundary_matrix() if node_boundary is None else node_boundary
+        bound_u = self.bound_u if bound_u is None else bound_u
+        values[mask] = (matrix @ bound_u)[mask]
+        return values
+
+    def triangles(self) -> np.ndarray:
+        """
+        Fan triangulation of the elements by their vertices, (triangle_count, 3) point indices.
+        """
+        sizes = np.diff(self.slot_offsets)
+        count = sizes - 2
+        first = np.repeat(self.slot_offsets[:-1], count)
+        local = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+        return np.stack([
+            self.slot_point[first], self.slot_point[first + local + 1], self.slot_point[first + local + 2]
+        ], axis=1)
+
+    def to_objects(self, u: np.ndarray) -> tuple[list[Element], list[Face], list[Face]]:
+        """
+        Build Element and Face objects filled from the arrays.
+
+        Returns
+        -------
+        Elements, faces and boundary faces in the order of the ##Boundary section.
+        """
+        vertex = [Vector2D(x, y) for x, y in zip(self.points[0].tolist(), self.points[1].tolist())]
+
+        faces: list[Face] = [None for _ in range(self.face_count)]
+        for f, (p1, p2) in enumerate(self.face_points.tolist()):
+            face = Face(vertex[p1].clone(), vertex[p2].clone())
+            face.id = f
+            face.point_id_1 = p1
+            face.point_id_2 = p2
+            faces[f] = face
+
+        elements: list[Element] = [None for _ in range(self.element_count)]
+        for e in range(self.element_count):
+            start, end = int(self.slot_offsets[e]), int(self.slot_offsets[e + 1])
+            elem = Element(end - start)
+            elem.id = e
+            elem.k = float(self.k[e])
+            elem.u = float(u[e])
+            elem.volume = float(self.volume[e])
+            elem.centroid = Vector2D(*self.centroid[e])
+            elem.set_polygon([vertex[p].clone() for p in self.slot_point[start:end].tolist()])
+            elem.faces = [faces[f] for f in self.slot_face[start:end].tolist()]
+            elem.flux = self.slot_flux[start:end].tolist()
+            elements[e] = elem
+
+        for f, face in enumerate(faces):
+            face.owner = elements[self.face_owner[f]]
+            if self.face_neighbour[f] >= 0:
+                face.neighbour_elem = elements[self.face_neighbour[f]]
+
+        for e, elem in enumerate(elements):
+            start = int(self.slot_offsets[e])
+            for num_face in range(elem.list_length):
+                neighbour = int(self.slot_neighbour[start + num_face])
+                elem.neighbours[num_face] = None if neighbour < 0 else elements[neighbour]
+
+        bound_faces = [faces[f] for f in self.bound_face.tolist()]
+        for b, face in enumerate(bound_faces):
+            face.bound_domain = int(self.bound_domain[b])
+            face.bound_group = int(self.bound_group[b])
+            face.set_boundary(BoundaryType.const_bound, float(self.bound_u[face.id]))
+
+        #  оставшиеся геометрические величины считаются как в Element.calc
+        for face in faces:
+            face.calc()
+        for elem in elements:
+            for num_face in range(elem.list_length):
+                face = elem.faces[num_face]
+                neighbour = elem.neighbours[num_face]
+                elem.center_face_dist[num_face] = face.centroid - elem.centroid
+                if neighbour is not None:
+                    elem.center_neighbour_dist[num_face] = neighbour.centroid - elem.centroid
+                    elem.neighbour_face_dist[num_face] = neighbour.centroid - face.centroid
+                    elem.geom_interpolate_factor[num_face] = (
+                            elem.center_face_dist[num_face].__len__() /
+                            (elem.center_face_dist[num_face].__len__() + elem.neighbour_face_dist[num_face].__len__())
+                    )
+                else:
+                    elem.center_neighbour_dist[num_face] = face.centroid - elem.centroid
+                elem.node_distances[num_face] = elem.center_neighbour_dist[num_face].__len__()
+
+        return elements, faces, bound_faces
+
+
+def face_flux_coefficients(
+        sf: np.ndarray,
+        dcf: np.ndarray,
+        k: np.ndarray,
+        boundary: np.ndarray
+) -> np.ndarray:
+    """
+    Batched Element.calc_fluxes for constant temperature boundaries.
+
+    Parameters
+    ----------
+    sf
+        Face normals scaled by face length, (n, 2).
+    dcf
+        Vectors from element centroid to face centroid, (n, 2).
+    k
+        Element conductivity, (n,).
+    boundary
+        Mask of boundary faces, (n,).
+    """
+    #  |ef| = |e1 * sf| для e1 = dcf / |dcf|, знак sf не важен
+    dcf_len2 = np.sum(dcf ** 2, axis=1)
+    ef_len = np.abs(np.sum(sf * dcf, axis=1)) / np.sqrt(dcf_len2)
+    flux = k * (ef_len / np.sqrt(dcf_len2))
+    return np.where(boundary, flux, -flux)
@@ -0,0 +1,338 @@
+from typing import Optional
+
+import numpy as np
+
+from loader import PolygonCells
+
+
+def refine_uniform(
+        points: np.ndarray,
+        polys: np.ndarray | PolygonCells,
+        bound: np.ndarray,
+        levels: int = 1
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Split every triangle into four through the edge midpoints.
+
+    Parameters
+    ----------
+    points, polys, bound
+        Mesh in the layout returned by `loader.load_from_file` (zero-based indices).
+    levels
+        Number of refinement passes; each pass multiplies the element count by 4.
+
+    Returns
+    -------
+    Refined points, polys and bound in the same layout.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if isinstance(polys, PolygonCells):
+        polys = polys.to_polys()
+    polys = np.asarray(polys, dtype=np.int64)
+    bound = np.asarray(bound, dtype=np.float64)
+    if polys.shape[0] - 1 != 3:
+        raise ValueError("Uniform refinement supports triangle meshes only")
+
+    for _ in range(levels):
+        point_count = points.shape[1]
+        a, b, c = polys[0], polys[1], polys[2]
+
+        edges = np.stack([np.stack([a, b]), np.stack([b, c]), np.stack([c, a])])  # (3, 2, element_count)
+        keys = np.minimum(edges[:, 0], edges[:, 1]) * point_count + np.maximum(edges[:, 0], edges[:, 1])
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        inverse = inverse.reshape(keys.shape)
+        p1 = unique_keys // point_count
+        p2 = unique_keys % point_count
+        midpoints = (points[:, p1] + points[:, p2]) / 2
+
+        mab, mbc, mca = (point_count + inverse[i] for i in range(3))
+        subdomain = polys[3]
+        polys = np.concatenate([
+            np.stack([a, mab, mca, subdomain]),
+            np.stack([mab, b, mbc, subdomain]),
+            np.stack([mca, mbc, c, subdomain]),
+            np.stack([mab, mbc, mca, subdomain]),
+        ], axis=1)
+
+        bp1 = bound[0].astype(np.int64)
+        bp2 = bound[1].astype(np.int64)
+        bound_keys = np.minimum(bp1, bp2) * point_count + np.maximum(bp1, bp2)
+        middle = point_count + np.searchsorted(unique_keys, bound_keys)
+        t_middle = (bound[2] + bound[3]) / 2
+        first = bound.copy()
+        first[1] = middle
+        first[3] = t_middle
+        second = bound.copy()
+        second[0] = middle
+        second[2] = t_middle
+        bound = np.stack([first, second], axis=2).reshape(bound.shape[0], -1)
+
+        points = np.concatenate([points, midpoints], axis=1)
+
+    return points, polys, bound
+
+
+def edge_keys(p: np.ndarray, q: np.ndarray) -> np.ndarray:
+    p = np.asarray(p, dtype=np.int64)
+    q = np.asarray(q, dtype=np.int64)
+    return (np.minimum(p, q) << 32) | np.maximum(p, q)
+
+
+def gradient_indicator(mesh, u: np.ndarray) -> np.ndarray:
+    """
+    Largest temperature jump of every element across its faces (to the neighbour or to the boundary value).
+    """
+    other = np.where(
+        mesh.slot_neighbour >= 0, u[np.maximum(mesh.slot_neighbour, 0)], mesh.bound_u[mesh.slot_face]
+    )
+    #  у граней без соседа и без граничного условия скачка нет
+    jump = np.where(mesh.slot_boundary | (mesh.slot_neighbour >= 0), np.abs(other - u[mesh.slot_cell]), 0)
+    return np.maximum.reduceat(jump, mesh.slot_offsets[:-1]) if mesh.element_count else jump[:0]
+
+
+class AdaptiveMesh:
+    """
+    Red-green h-refinement of a triangle mesh.
+
+    Elements of the base mesh are roots of trees of red refinements (1 -> 4 through the edge midpoints,
+    as in `refine_uniform`). The leaves may differ by one level across an edge; a leaf with one refined
+    neighbour edge is bisected into two green triangles to keep the mesh conforming, a leaf with more
+    is refined itself. Green triangles exist only in the output mesh, so repeated adaptation
+    never degrades the element shape.
+
+    Parameters
+    ----------
+    points, polys, bound
+        Base triangle mesh in the layout returned by `loader.load_from_file`.
+    max_level
+        Largest number of red refinements of a base element.
+    """
+
+    def __init__(self, points: np.ndarray, polys: np.ndarray | PolygonCells, bound: np.ndarray, max_level: int = 3):
+        if isinstance(polys, PolygonCells):
+            polys = polys.to_polys()
+        polys = np.asarray(polys, dtype=np.int64)
+        if polys.shape[0] - 1 != 3:
+            raise ValueError("Adaptive refinement supports triangle meshes only")
+        self.points: np.ndarray = np.array(points, dtype=np.float64)
+        self.base_bound: np.ndarray = np.asarray(bound, dtype=np.float64)
+        self.max_level: int = max_level
+
+        count = polys.shape[1]
+        self.node_vertices: np.ndarray = polys[:3].T.copy()
+        self.node_subdomain: np.ndarray = polys[3].copy()
+        self.node_level: np.ndarray = np.zeros(count, dtype=np.int64)
+        self.node_children: np.ndarray = np.full((count, 4), -1, dtype=np.int64)
+        self.node_u: np.ndarray = np.zeros(count, dtype=np.float64)
+        self.in_tree: np.ndarray = np.ones(count, dtype=bool)
+        self.expanded: np.ndarray = np.zeros(count, dtype=bool)
+        #  середины рёбер: отсортированные ключи рёбер и номера точек
+        self._mid_keys: np.ndarray = np.zeros(0, dtype=np.int64)
+        self._mid_ids: np.ndarray = np.zeros(0, dtype=np.int64)
+
+        self.element_node: np.ndarray = np.zeros(0, dtype=np.int64)  # лист дерева каждого выходного элемента
+        self._arrays: tuple[np.ndarray, np.ndarray, np.ndarray] = self._build()
+
+    def arrays(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Current conforming mesh as points, polys and bound.
+        """
+        return self._arrays
+
+    @property
+    def element_level(self) -> np.ndarray:
+        return self.node_level[self.element_node]
+
+    def leaves(self) -> np.ndarray:
+        return np.flatnonzero(self.in_tree & ~self.expanded)
+
+    def _lookup(self, p: np.ndarray, q: np.ndarray) -> np.ndarray:
+        keys = edge_keys(p, q)
+        if len(self._mid_keys) == 0:
+            return np.full(keys.shape, -1, dtype=np.int64)
+        position = np.minimum(np.searchsorted(self._mid_keys, keys), len(self._mid_keys) - 1)
+        return np.where(self._mid_keys[position] == keys, self._mid_ids[position], -1)
+
+    def _midpoints(self, p: np.ndarray, q: np.ndarray) -> np.ndarray:
+        ids = self._lookup(p, q)
+        missing = ids < 0
+        if np.any(missing):
+            new_keys, first, inverse = np.unique(edge_keys(p, q)[missing], return_index=True, return_inverse=True)
+            new_ids = self.points.shape[1] + np.arange(len(new_keys))
+            pm, qm = p[missing][first], q[missing][first]
+            self.points = np.concatenate([self.points, (self.points[:, pm] + self.points[:, qm]) / 2], axis=1)
+            keys = np.concatenate([self._mid_keys, new_keys])
+            order = np.argsort(keys, kind="stable")
+            self._mid_keys = keys[order]
+            self._mid_ids = np.concatenate([self._mid_ids, new_ids])[order]
+            ids[missing] = new_ids[inverse]
+        return ids
+
+    def _refine(self, nodes: np.ndarray, prolong: bool = True) -> None:
+        new = nodes[self.node_children[nodes, 0] < 0]
+        if len(new):
+            a, b, c = self.node_vertices[new].T
+            mab, mbc, mca = self._midpoints(a, b), self._midpoints(b, c), self._midpoints(c, a)
+            vertices = np.stack([
+                np.stack([a, mab, mca], axis=1),
+                np.stack([mab, b, mbc], axis=1),
+                np.stack([mca, mbc, c], axis=1),
+                np.stack([mab, mbc, mca], axis=1),
+            ], axis=1).reshape(-1, 3)
+            first = len(self.node_level)
+            count = 4 * len(new)
+            self.node_vertices = np.concatenate([self.node_vertices, vertices])
+            self.node_subdomain = np.concatenate([self.node_subdomain, np.repeat(self.node_subdomain[new], 4)])
+            self.node_level = np.concatenate([self.node_level, np.repeat(self.node_level[new] + 1, 4)])
+            self.node_children = np.concatenate([self.node_children, np.full((count, 4), -1, dtype=np.int64)])
+            self.node_u = np.concatenate([self.node_u, np.zeros(count)])
+            self.in_tree = np.concatenate([self.in_tree, np.zeros(count, dtype=bool)])
+            self.expanded = np.concatenate([self.expanded, np.zeros(count, dtype=bool)])
+            self.node_children[new] = first + np.arange(count).reshape(-1, 4)
+
+        children = self.node_children[nodes]
+        self.expanded[nodes] = True
+        self.in_tree[children] = True
+        self.expanded[children] = False
+        if prolong:
+            #  дочерние элементы получают значение родителя: количество тепла сохраняется
+            self.node_u[children] = self.node_u[nodes][:, None]
+
+    def _coarsen(self, nodes: np.ndarray) -> None:
+        children = self.node_children[nodes]
+        #  у красных потомков равные площади, среднее сохраняет количество тепла
+        self.node_u[nodes] = self.node_u[children].mean(axis=1)
+        self.expanded[nodes] = False
+        self.in_tree[children] = False
+
+    def _hanging(self, leaves: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Midpoint of every edge of the leaves that is a vertex of the mesh (-1 otherwise), (leaf_count, 3),
+        and whether a leaf has an edge refined twice.
+        """
+        vertices = self.node_vertices[leaves]
+        active = np.zeros(self.points.shape[1], dtype=bool)
+        active[self.node_vertices[self.leaves()]] = True
+        p = vertices
+        q = np.roll(vertices, -1, axis=1)
+        middle = self._lookup(p, q)
+        middle = np.where((middle >= 0) & active[np.maximum(middle, 0)], middle, -1)
+        hanging = middle >= 0
+        twice = np.zeros(len(leaves), dtype=bool)
+        if np.any(hanging):
+            m = middle[hanging]
+            quarter = np.stack([self._lookup(p[hanging], m), self._lookup(m, q[hanging])])
+            refined = np.any((quarter >= 0) & active[np.maximum(quarter, 0)], axis=0)
+            twice[np.nonzero(hanging)[0][refined]] = True
+        return middle, twice
+
+    def _invalid(self, leaves: np.ndarray) -> np.ndarray:
+        middle, twice = self._hanging(leaves)
+        return ((middle >= 0).sum(axis=1) >= 2) | twice
+
+    def adapt(
+            self,
+            u: np.ndarray,
+            volume: np.ndarray,
+            indicator: np.ndarray,
+            refine_threshold: float,
+            coarsen_threshold: Optional[float] = None
+    ) -> np.ndarray:
+        """
+        Refine the elements with `indicator` above `refine_threshold`, coarsen the families of elements
+        below `coarsen_threshold` and return `u` transferred to the new mesh (total `volume * u` is kept).
+
+        All arrays are per element of the current mesh `arrays()`.
+        """
+        leaves = self.leaves()
+        leaf_volume = np.bincount(self.element_node, weights=volume, minlength=len(self.node_level))
+        leaf_heat = np.bincount(self.element_node, weights=volume * u, minlength=len(self.node_level))
+        self.node_u[leaves] = leaf_heat[leaves] / leaf_volume[leaves]
+        leaf_indicator = np.zeros(len(self.node_level))
+        np.maximum.at(leaf_indicator, self.element_node, indicator)
+
+        refine = leaves[(leaf_indicator[leaves] > refine_threshold) & (self.node_level[leaves] < self.max_level)]
+
+        coarsened = np.zeros(0, dtype=np.int64)
+        if coarsen_threshold is not None:
+            parents = np.flatnonzero(self.in_tree & self.expanded)
+            children = self.node_children[parents]
+            smooth = ~self.expanded[children] & (leaf_indicator[children] < coarsen_threshold)
+            coarsened = parents[np.all(smooth, axis=1)]
+            self._coarsen(coarsened)
+        self._refine(refine)
+
+        #  огрубление, после которого лист стал бы несогласованным, отменяется
+        while len(coarsened):
+            invalid = coarsened[self._invalid(coarsened)]
+            if len(invalid) == 0:
+                break
+            self._refine(invalid, prolong=False)
+            coarsened = np.setdiff1d(coarsened, invalid)
+
+        while True:
+            leaves = self.leaves()
+            invalid = leaves[self._invalid(leaves)]
+            if len(invalid) == 0:
+                break
+            self._refine(invalid)
+
+        self._arrays = self._build()
+        return self.node_u[self.element_node]
+
+    def _build(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        leaves = self.leaves()
+        vertices = self.node_vertices[leaves]
+        middle, _ = self._hanging(leaves)
+        green = np.any(middle >= 0, axis=1)
+
+        #  поворачиваем вершины зелёных листов так, чтобы разбиваемое ребро было (a, b)
+        edge = np.argmax(middle >= 0, axis=1)
+        rows = np.arange(len(leaves))[:, None]
+        rotated = vertices[rows, (edge[:, None] + np.arange(3)) % 3]
+        m = middle[np.arange(len(leaves)), edge]
+        a, b, c = rotated.T
+        first = np.where(green[:, None], np.stack([a, m, c], axis=1), vertices)
+        second = np.stack([m, b, c], axis=1)[green]
+
+        counts = 1 + green
+        element_node = np.repeat(leaves, counts)
+        cells = np.empty((len(element_node), 3), dtype=np.int64)
+        start = np.cumsum(counts) - counts
+        cells[start] = first
+        cells[start[green] + 1] = second
+        self.element_node = element_node
+
+        polys = np.concatenate([cells.T, self.node_subdomain[element_node][None]])
+
+        #  граничные рёбра делятся, пока их середина - вершина сетки
+        active = np.zeros(self.points.shape[1], dtype=bool)
+        active[cells] = True
+        bound = self.base_bound
+        while bound.shape[1]:
+            m = self._lookup(bound[0].astype(np.int64), bound[1].astype(np.int64))
+            split = (m >= 0) & active[np.maximum(m, 0)]
+            if not np.any(split):
+                break
+            position = np.cumsum(1 + split) - (1 + split)
+            t_middle = (bound[2] + bound[3]) / 2
+            bound = np.repeat(bound, 1 + split, axis=1)
+            bound[1, position[split]] = m[split]
+            bound[3, position[split]] = t_middle[split]
+            bound[0, position[split] + 1] = m[split]
+            bound[2, position[split] + 1] = t_middle[split]
+
+        return self.points, polys, bound
+
+    def apply(self, solver, refine_threshold: float, coarsen_threshold: Optional[float] = None) -> None:
+        """
+        Adapt to the temperature jumps of the solver field and move the solver to the new mesh.
+        A reordered solver (`HeatEquationSolver.reorder`) is mapped back to the element order of this mesh
+        and continues on the new mesh without reordering.
+        """
+        mesh = solver.mesh
+        u = solver.original_order()
+        volume = solver.original_order(mesh.volume)
+        indicator = solver.original_order(gradient_indicator(mesh, solver.u))
+        u = self.adapt(u, volume, indicator, refine_threshold, coarsen_threshold)
+        solver.replace_mesh(*self._arrays, u, k=float(mesh.k[0]))
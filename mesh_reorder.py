@@ -0,0 +1,73 @@
+from enum import Enum
+
+import numpy as np
+from scipy.sparse import csr_array
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+from mesh_arrays import MeshArrays
+
+
+class Ordering(Enum):
+    rcm = 0  # обратный алгоритм Катхилла-Макки по графу соседства
+    hilbert = 1  # кривая Гильберта по центрам элементов
+    morton = 2  # Z-кривая по центрам элементов
+
+
+def _grid_coordinates(centroid: np.ndarray, bits: int) -> tuple[np.ndarray, np.ndarray]:
+    low = centroid.min(axis=0)
+    size = np.max(centroid.max(axis=0) - low)
+    scale = ((1 << bits) - 1) / size if size > 0 else 0
+    cells = ((centroid - low) * scale).astype(np.int64)
+    return cells[:, 0], cells[:, 1]
+
+
+def morton_keys(centroid: np.ndarray, bits: int = 16) -> np.ndarray:
+    x, y = _grid_coordinates(centroid, bits)
+    keys = np.zeros(len(centroid), dtype=np.int64)
+    for bit in range(bits):
+        keys |= ((x >> bit) & 1) << (2 * bit) | ((y >> bit) & 1) << (2 * bit + 1)
+    return keys
+
+
+def hilbert_keys(centroid: np.ndarray, bits: int = 16) -> np.ndarray:
+    """
+    Distance along the Hilbert curve of order `bits` through the bounding square of the centroids.
+    """
+    x, y = _grid_coordinates(centroid, bits)
+    keys = np.zeros(len(centroid), dtype=np.int64)
+    n = 1 << bits
+    s = n >> 1
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        keys += s * s * ((3 * rx) ^ ry)
+        #  поворот квадранта
+        flip = ~ry & rx
+        x = np.where(flip, n - 1 - x, x)
+        y = np.where(flip, n - 1 - y, y)
+        x, y = np.where(~ry, y, x), np.where(~ry, x, y)
+        s >>= 1
+    return keys
+
+
+def element_order(mesh: MeshArrays, ordering: Ordering = Ordering.rcm) -> np.ndarray:
+    """
+    Permutation of elements for `MeshArrays.permute`: new element `i` is old element `order[i]`.
+    """
+    if ordering == Ordering.rcm:
+        interior = mesh.slot_neighbour >= 0
+        graph = csr_array(
+            (np.ones(np.count_nonzero(interior)), (mesh.slot_cell[interior], mesh.slot_neighbour[interior])),
+            shape=(mesh.element_count, mesh.element_count)
+        )
+        return reverse_cuthill_mckee(graph, symmetric_mode=True).astype(np.int64)
+    keys = hilbert_keys(mesh.centroid) if ordering == Ordering.hilbert else morton_keys(mesh.centroid)
+    return np.argsort(keys, kind="stable")
+
+
+def bandwidth(mesh: MeshArrays) -> int:
+    """
+    Largest distance between the numbers of two neighbouring elements.
+    """
+    interior = mesh.slot_neighbour >= 0
+    return int(np.max(np.abs(mesh.slot_neighbour[interior] - mesh.slot_cell[interior]), initial=0))
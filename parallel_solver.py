@@ -0,0 +1,268 @@
+import multiprocessing
+import traceback
+from multiprocessing import connection, shared_memory
+from typing import Optional
+
+import numpy as np
+from scipy.sparse import csr_array
+
+from mesh_arrays import MeshArrays
+from solver import HeatEquationSolver, TimeScheme
+
+
+def partition_elements(centroid: np.ndarray, parts: int) -> np.ndarray:
+    """
+    Recursive coordinate bisection of element centroids.
+
+    Parameters
+    ----------
+    centroid
+        Element centroids, (element_count, 2).
+    parts
+        Number of subdomains.
+
+    Returns
+    -------
+    Subdomain id of every element; subdomain sizes differ by at most one element per bisection level.
+    """
+    part = np.zeros(len(centroid), dtype=np.int64)
+
+    def bisect(ids: np.ndarray, first_part: int, count: int) -> None:
+        if count == 1:
+            part[ids] = first_part
+            return
+        left_count = count // 2
+        coords = centroid[ids]
+        axis = int(np.argmax(coords.max(axis=0) - coords.min(axis=0)))
+        order = ids[np.argsort(coords[:, axis], kind="stable")]
+        split = len(ids) * left_count // count
+        bisect(order[:split], first_part, left_count)
+        bisect(order[split:], first_part + left_count, count - left_count)
+
+    bisect(np.arange(len(centroid), dtype=np.int64), 0, parts)
+    return part
+
+
+class Subdomain:
+    """
+    Rows of the Jacobi step owned by one worker.
+
+    Columns of `operator` are numbered in `local_ids` (owned and halo elements, sorted by global id),
+    so every row keeps the entry order of the global operator and sums match the serial step bit for bit.
+    """
+
+    def __init__(self, mesh: MeshArrays, operator: csr_array, own: np.ndarray):
+        self.own: np.ndarray = own
+        rows_start = operator.indptr[own]
+        rows_end = operator.indptr[own + 1]
+        lengths = rows_end - rows_start
+        indptr = np.zeros(len(own) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        entries = np.arange(indptr[-1]) + np.repeat(rows_start - indptr[:-1], lengths)
+        columns = operator.indices[entries]
+
+        self.local_ids: np.ndarray = np.union1d(own, columns)
+        global_to_local = np.full(mesh.element_count, -1, dtype=np.int64)
+        global_to_local[self.local_ids] = np.arange(len(self.local_ids))
+        self.operator: csr_array = csr_array(
+            (operator.data[entries], global_to_local[columns], indptr),
+            shape=(len(own), len(self.local_ids))
+        )
+
+        #  граничные слоты своих элементов, в том же порядке, что и в MeshArrays.boundary_source
+        own_mask = np.zeros(mesh.element_count, dtype=bool)
+        own_mask[own] = True
+        slots = np.flatnonzero(mesh.slot_boundary & own_mask[mesh.slot_cell])
+        own_local = np.full(mesh.element_count, -1, dtype=np.int64)
+        own_local[own] = np.arange(len(own))
+        self.bound_cell: np.ndarray = own_local[mesh.slot_cell[slots]]
+        self.bound_face: np.ndarray = mesh.slot_face[slots]
+        self.bound_flux: np.ndarray = mesh.slot_flux[slots]
+
+    def boundary_source(self, bound_u: np.ndarray) -> np.ndarray:
+        return np.bincount(
+            self.bound_cell, weights=self.bound_flux * bound_u[self.bound_face], minlength=len(self.own)
+        )
+
+
+def _attach(name: str, shape: tuple[int, ...]) -> tuple[shared_memory.SharedMemory, np.ndarray]:
+    memory = shared_memory.SharedMemory(name=name)
+    return memory, np.ndarray(shape, dtype=np.float64, buffer=memory.buf)
+
+
+def _worker(subdomain: Subdomain, u_names: tuple[str, str], bound_name: str, element_count: int, face_count: int, conn, barrier) -> None:
+    memories = []
+    buffers = []
+    for name in u_names:
+        memory, array = _attach(name, (element_count,))
+        memories.append(memory)
+        buffers.append(array)
+    memory, bound_u = _attach(bound_name, (face_count,))
+    memories.append(memory)
+
+    own = subdomain.own
+    local_ids = subdomain.local_ids
+    try:
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            n_steps, delta, parity = message
+            try:
+                bc = subdomain.boundary_source(bound_u)
+                for _ in range(n_steps):
+                    src = buffers[parity]
+                    dst = buffers[1 - parity]
+                    #  значения своих и соседних (halo) элементов из общей памяти
+                    u_local = src[local_ids]
+                    dst[own] = src[own] + delta * (bc - subdomain.operator @ u_local)
+                    barrier.wait()
+                    parity = 1 - parity
+            except BaseException:
+                #  остальные рабочие не должны ждать на барьере шага, который не будет сделан
+                barrier.abort()
+                conn.send(traceback.format_exc())
+                break
+            conn.send(parity)
+    finally:
+        for memory in memories:
+            memory.close()
+
+
+class PartitionedHeatEquationSolver:
+    """
+    Jacobi time stepping of a prepared HeatEquationSolver split into subdomains, one worker process each.
+
+    The field lives in two shared-memory buffers; each step a worker reads the owned and halo values
+    from one buffer and writes its owned values to the other. The result equals the serial solver
+    with `TimeScheme.jacobi` exactly, so only Jacobi solvers are accepted; the in-place sweep of
+    `TimeScheme.explicit` is sequential by nature and is not parallelized.
+
+    An attached recorder and checkpointing work as in the serial `run_physics`; the field is then
+    copied back into the solver after every step. If a worker fails, the others are released and
+    the solver cannot be used further.
+    """
+
+    def __init__(self, solver: HeatEquationSolver, workers: int, partition: Optional[np.ndarray] = None):
+        if solver.scheme != TimeScheme.jacobi:
+            raise ValueError(f"Partitioned stepping requires TimeScheme.jacobi, the solver uses {solver.scheme.name}")
+        self.solver: HeatEquationSolver = solver
+        self.workers: int = workers
+        mesh = solver.mesh
+        self.partition: np.ndarray = partition_elements(mesh.centroid, workers) if partition is None else partition
+
+        element_count = mesh.element_count
+        self._u_memory = [
+            shared_memory.SharedMemory(create=True, size=max(element_count, 1) * 8) for _ in range(2)
+        ]
+        self._bound_memory = shared_memory.SharedMemory(create=True, size=max(mesh.face_count, 1) * 8)
+        self._u = [np.ndarray((element_count,), dtype=np.float64, buffer=m.buf) for m in self._u_memory]
+        self._bound_u = np.ndarray((mesh.face_count,), dtype=np.float64, buffer=self._bound_memory.buf)
+        self._u[0][:] = solver.u
+        self._parity: int = 0
+        self._failed: bool = False
+
+        context = multiprocessing.get_context()
+        barrier = context.Barrier(workers)
+        self._barrier = barrier
+        self._connections = []
+        self._processes = []
+        for p in range(workers):
+            subdomain = Subdomain(mesh, solver.operator, np.flatnonzero(self.partition == p))
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=_worker,
+                args=(
+                    subdomain, tuple(m.name for m in self._u_memory), self._bound_memory.name,
+                    element_count, mesh.face_count, child, barrier
+                ),
+                daemon=True
+            )
+            process.start()
+            #  без своей копии конца канала родитель получит EOFError, если рабочий процесс умрёт
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+
+    @property
+    def u(self) -> np.ndarray:
+        return self._u[self._parity].copy()
+
+    def run_physics(self, n_steps: int = 1) -> None:
+        """
+        Advance `n_steps` Jacobi steps and copy the field back into the serial solver.
+        Static boundaries are sent to the workers once per call, time-dependent ones every step;
+        with a recorder or checkpointing the workers also stop after every step.
+        """
+        solver = self.solver
+        every_step = solver.recorder is not None or solver.checkpoint_path is not None
+        chunks = [n_steps] if solver.boundary_is_static and not every_step else [1] * n_steps
+        for chunk in chunks:
+            solver.set_periodic_boundary()
+            self._bound_u[:] = solver.mesh.bound_u
+            self._step(chunk, solver.delta)
+            solver.iteration_count += chunk
+            solver.time += chunk * solver.delta
+            if not every_step:
+                continue
+            solver.set_u(self.u)
+            if solver.recorder is not None:
+                solver.recorder.on_step(solver)
+            if solver.checkpoint_path is not None and solver.iteration_count % solver.checkpoint_every == 0:
+                solver.save_checkpoint(solver.checkpoint_path)
+
+        solver.set_u(self.u)
+
+    def _step(self, n_steps: int, delta: float) -> None:
+        if self._failed:
+            raise RuntimeError("A worker of the partitioned solver has failed")
+        errors = []
+        pending = []
+        for conn in self._connections:
+            try:
+                conn.send((n_steps, delta, self._parity))
+                pending.append(conn)
+            except OSError:
+                errors.append("Worker process exited")
+        if errors:
+            self._barrier.abort()
+        while pending:
+            for conn in connection.wait(pending):
+                pending.remove(conn)
+                try:
+                    reply = conn.recv()
+                except EOFError:
+                    reply = "Worker process exited"
+                if isinstance(reply, str):
+                    #  остальные рабочие освобождаются с барьера и отвечают ошибкой
+                    errors.append(reply)
+                    self._barrier.abort()
+                else:
+                    self._parity = reply
+        if errors:
+            self._failed = True
+            raise RuntimeError(f"Partitioned step failed:\n{errors[0]}")
+
+    def close(self) -> None:
+        for conn in self._connections:
+            try:
+                conn.send(None)
+            except OSError:
+                pass  # рабочий уже завершился после ошибки
+        for process in self._processes:
+            process.join()
+        self._connections = []
+        self._processes = []
+        self._u = []
+        self._bound_u = None
+        for memory in self._u_memory + [self._bound_memory]:
+            memory.close()
+            memory.unlink()
+        self._u_memory = []
+
+    def __enter__(self) -> "PartitionedHeatEquationSolver":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
@@ -1,44 +1,116 @@
-def periodic_boundary_condition(domain: str, face_domain: int = 0, face_group: int = 0, value: int = 255):
-    match domain:
-        case "p":
-            return p_periodic_boundary_condition(face_domain, face_group, 255)
-        case "std":
-            return std_periodic_boundary_condition(face_domain, face_group, 255)
-        case "stdref":
-            return std_periodic_boundary_condition(face_domain, face_group, 255)
-        case "circle_eye":
-            return circle_eye_periodic_boundary_condition(face_domain, face_group, 295)
-        case "circle":
-            return circle_periodic_boundary_condition(face_domain, face_group, 255)
-        case "triangle":
-            return triangle_periodic_boundary_condition(face_domain, face_group, 255)
-
-
-def p_periodic_boundary_condition(face_domain: int, face_group: int, value: int) -> int:
-    if face_domain == 0:
-        return 0
-    return value
-
-
-def std_periodic_boundary_condition(face_domain: int, face_group: int, value: int) -> int:
-    if face_group == 3:
-        return value
-    return 0
-
-
-def circle_eye_periodic_boundary_condition(face_domain: int, face_group: int, value: int) -> int:
-    if face_domain == 0:
-        return value
-    return 0
-
-
-def circle_periodic_boundary_condition(face_domain: int, face_group: int, value: int) -> int:
-    if face_domain == 0 and (face_group == 6 or face_group == 8):
-        return value
-    return 0
-
-
-def triangle_periodic_boundary_condition(face_domain: int, face_group: int, value: int) -> int:
-    if face_group == 5 or face_group == 1 or face_group == 7:
-        return value
-    return 0
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import numpy as np
+
+HOT = "hot"  # значение правила - горячая температура таблицы (или переданная вместо неё)
+
+BoundaryValue = float | str | Callable[[float], float | np.ndarray]
+
+
+@dataclass
+class BoundaryRule:
+    """
+    Temperature of the boundary faces matching `domains` and `groups` (None matches any).
+
+    `value` is a number, `HOT`, or a callable of model time returning a number or an array
+    with one value per matching face; callables are evaluated once per step.
+    """
+    value: BoundaryValue
+    domains: Optional[tuple[int, ...]] = None
+    groups: Optional[tuple[int, ...]] = None
+
+    def matches(self, bound_domain: np.ndarray, bound_group: np.ndarray) -> np.ndarray:
+        mask = np.ones(len(bound_domain), dtype=bool)
+        if self.domains is not None:
+            mask &= np.isin(bound_domain, self.domains)
+        if self.groups is not None:
+            mask &= np.isin(bound_group, self.groups)
+        return mask
+
+
+@dataclass
+class BoundaryTable:
+    """
+    Boundary conditions of a domain: the first matching rule sets the face temperature, `default` otherwise.
+    """
+    hot: float
+    rules: list[BoundaryRule] = field(default_factory=list)
+    default: float = 0
+
+    def compile(
+            self,
+            face_count: int,
+            bound_face: np.ndarray,
+            bound_domain: np.ndarray,
+            bound_group: np.ndarray,
+            hot: Optional[float] = None
+    ) -> "CompiledBoundary":
+        hot = self.hot if hot is None else hot
+        static_u = np.zeros(face_count, dtype=np.float64)
+        static_u[bound_face] = self.default
+        dynamic: list[tuple[np.ndarray, Callable[[float], float | np.ndarray]]] = []
+        unassigned = np.ones(len(bound_face), dtype=bool)
+        for rule in self.rules:
+            mask = rule.matches(bound_domain, bound_group) & unassigned
+            unassigned &= ~mask
+            faces = bound_face[mask]
+            if callable(rule.value):
+                dynamic.append((faces, rule.value))
+            else:
+                static_u[faces] = hot if rule.value == HOT else rule.value
+        return CompiledBoundary(static_u, dynamic)
+
+
+class CompiledBoundary:
+    """
+    Boundary temperature per face: static values once, time-dependent rules as (faces, callable).
+    """
+
+    def __init__(self, static_u: np.ndarray, dynamic: list[tuple[np.ndarray, Callable[[float], float | np.ndarray]]]):
+        self.static_u: np.ndarray = static_u
+        self.dynamic: list[tuple[np.ndarray, Callable[[float], float | np.ndarray]]] = dynamic
+
+    @property
+    def is_static(self) -> bool:
+        return not self.dynamic
+
+    def apply(self, bound_u: np.ndarray, time: float) -> None:
+        for faces, value in self.dynamic:
+            bound_u[faces] = value(time)
+
+    def initial(self, time: float = 0) -> np.ndarray:
+        bound_u = self.static_u.copy()
+        self.apply(bound_u, time)
+        return bound_u
+
+
+BOUNDARY_TABLES: dict[str, BoundaryTable] = {
+    "p": BoundaryTable(255, [BoundaryRule(0, domains=(0,)), BoundaryRule(HOT)]),
+    "std": BoundaryTable(255, [BoundaryRule(HOT, groups=(3,))]),
+    "stdref": BoundaryTable(255, [BoundaryRule(HOT, groups=(3,))]),
+    "circle_eye": BoundaryTable(295, [BoundaryRule(HOT, domains=(0,))]),
+    "circle": BoundaryTable(255, [BoundaryRule(HOT, domains=(0,), groups=(6, 8))]),
+    "triangle": BoundaryTable(255, [BoundaryRule(HOT, groups=(1, 5, 7))]),
+    "mixed": BoundaryTable(255, [BoundaryRule(HOT, groups=(4,))]),
+}
+
+
+def register_boundary(domain: str, table: BoundaryTable) -> None:
+    BOUNDARY_TABLES[domain] = table
+
+
+def boundary_table(domain: str) -> BoundaryTable:
+    if domain not in BOUNDARY_TABLES:
+        raise KeyError(f"No boundary conditions registered for domain {domain}")
+    return BOUNDARY_TABLES[domain]
+
+
+def periodic_boundary_condition(domain: str, face_domain: int = 0, face_group: int = 0, value: Optional[float] = None):
+    """
+    Temperature of one boundary face at time 0; `value` replaces the hot temperature of the domain if given.
+    """
+    compiled = boundary_table(domain).compile(
+        1, np.zeros(1, dtype=np.int64), np.array([face_domain]), np.array([face_group]), value
+    )
+    return compiled.initial()[0]
@@ -1,8 +1,16 @@
+import multiprocessing
+import shutil
+import subprocess
+from typing import Iterator, Optional
+
 import matplotlib.pyplot
+from matplotlib.collections import PolyCollection
+from matplotlib.colors import Normalize
 from matplotlib.patches import Polygon
 import numpy as np
 from element import Element
 from math_2d import Vector2D
+from recorder import FieldRecorder
 
 
 def plot_points(points: list[list[float]], plt):
@@ -50,7 +58,7 @@ def plot_elements(elements: list[Element], ax):
         plot_element(elem, normalize_coefficient, ax)
 
 
-def plot_u_polygon(vertex: list[Vector2D], u, max_value, ax):
+def plot_u_polygon(vertex: list[Vector2D] | np.ndarray, u, max_value, ax):
     vertices = np.array([[vertex[i][0], vertex[i][1]] for i in range(len(vertex))])
     color = get_color(int(u / max_value))
     polygon = Polygon(
@@ -66,12 +74,208 @@ def plot_polygons(data, norm_coeff, ax):
         plot_u_polygon(vertex, u, norm_coeff, ax)
 
 
-def create_frame(i, data_per_time, norm_coeff, ax, axes_sizes: tuple[float, float, float, float]):
+def plot_nodal_field(
+        points: np.ndarray,
+        triangles: np.ndarray,
+        values: np.ndarray,
+        ax,
+        max_value: Optional[float] = None
+):
+    """
+    Field given at the mesh vertices (e.g. `HeatEquationSolver.node_values`) with Gouraud shading;
+    `triangles` as returned by `MeshArrays.triangles`. Update it with `set_array(values)`.
+    """
+    if max_value is None:
+        max_value = float(np.max(values, initial=0))
+    return ax.tripcolor(
+        points[0], points[1], triangles, values, shading="gouraud",
+        cmap=matplotlib.pyplot.cm.viridis, norm=Normalize(0, max_value if max_value > 0 else 1)
+    )
+
+
+def create_frame(i, recorder: FieldRecorder, norm_coeff, ax, axes_sizes: tuple[float, float, float, float]):
     matplotlib.pyplot.cla()
     ax.set_xlim(axes_sizes[0] - 0.5, axes_sizes[1] + 0.5)
     ax.set_ylim(axes_sizes[2] - 0.5, axes_sizes[3] + 0.5)
-    plot_polygons(data_per_time[i], norm_coeff, ax)
+    plot_polygons((recorder.cell_vertices(), recorder.frame(i)), norm_coeff, ax)
     # ax.legend()
     ax.set_title(f"Time {i}")
 
 
+def create_field_collection(
+        vertices: list[np.ndarray],
+        ax,
+        axes_sizes: tuple[float, float, float, float],
+        max_value: float
+) -> PolyCollection:
+    """
+    One PolyCollection for all elements; frames only replace its colour array.
+    Colours match `plot_u_polygon`: viridis over [0, max_value].
+    """
+    collection = PolyCollection(
+        vertices, cmap=matplotlib.pyplot.cm.viridis, norm=Normalize(0, max_value if max_value > 0 else 1)
+    )
+    collection.set_edgecolor("face")
+    ax.add_collection(collection)
+    ax.set_xlim(axes_sizes[0] - 0.5, axes_sizes[1] + 0.5)
+    ax.set_ylim(axes_sizes[2] - 0.5, axes_sizes[3] + 0.5)
+    return collection
+
+
+def update_frame(i, recorder: FieldRecorder, collection: PolyCollection, ax):
+    collection.set_array(recorder.frame(i))
+    ax.set_title(f"Time {i}")
+    return collection,
+
+
+class FrameRenderer:
+    """
+    Off-screen figure with one PolyCollection; renders fields on the given cells to RGBA arrays.
+    """
+
+    def __init__(
+            self,
+            vertices: list[np.ndarray],
+            axes_sizes: tuple[float, float, float, float],
+            max_value: float,
+            figsize: tuple[float, float] = (6.4, 4.8),
+            dpi: int = 100
+    ):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot()
+        self.collection = create_field_collection(vertices, self.ax, axes_sizes, max_value)
+
+    def render(self, u: np.ndarray, title: str = "") -> np.ndarray:
+        self.collection.set_array(u)
+        self.ax.set_title(title)
+        self.canvas.draw()
+        return np.asarray(self.canvas.buffer_rgba()).copy()
+
+
+class AnimationWriter:
+    """
+    Appends RGBA frames to a .gif or an .mp4 (piped to ffmpeg on PATH).
+
+    Every frame goes to the file as soon as it is written, so memory does not grow with the frame count;
+    GIF frames are encoded with Pillow one by one, each with its own palette.
+    """
+
+    def __init__(self, path: str, fps: int = 15):
+        if not path.endswith((".gif", ".mp4")):
+            raise ValueError(f"Unsupported animation format: {path}")
+        self.path: str = path
+        self.fps: int = fps
+        self._gif = None
+        self._process: Optional[subprocess.Popen] = None
+        if path.endswith(".mp4") and shutil.which("ffmpeg") is None:
+            raise RuntimeError("Writing .mp4 requires ffmpeg on PATH")
+
+    def write(self, frame: np.ndarray) -> None:
+        if self.path.endswith(".gif"):
+            self._write_gif(frame)
+            return
+        if self._process is None:
+            height, width = frame.shape[:2]
+            command = [
+                shutil.which("ffmpeg"), "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgba",
+                "-s", f"{width}x{height}", "-r", str(self.fps), "-i", "-",
+                "-pix_fmt", "yuv420p", "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", self.path
+            ]
+            self._process = subprocess.Popen(command, stdin=subprocess.PIPE)
+        self._process.stdin.write(frame.tobytes())
+
+    def _write_gif(self, frame: np.ndarray) -> None:
+        from PIL import GifImagePlugin, Image
+
+        image = Image.fromarray(frame).convert("RGB").convert("P", palette=Image.Palette.ADAPTIVE)
+        duration = int(1000 / self.fps)
+        if self._gif is None:
+            #  палитра первого кадра - глобальная, у остальных кадров своя
+            header, _ = GifImagePlugin.getheader(image, info={"loop": 0, "duration": duration})
+            self._gif = open(self.path, "wb")
+            self._gif.write(b"".join(header))
+            data = GifImagePlugin.getdata(image, duration=duration)
+        else:
+            data = GifImagePlugin.getdata(image, duration=duration, include_color_table=True)
+        self._gif.write(b"".join(data))
+
+    def close(self) -> None:
+        gif, self._gif = self._gif, None
+        if gif is not None:
+            try:
+                gif.write(b";")  # конец файла GIF
+            finally:
+                gif.close()
+        process, self._process = self._process, None
+        if process is not None:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass  # ffmpeg уже завершился, код возврата скажет почему
+            if process.wait() != 0:
+                raise RuntimeError(f"ffmpeg failed with code {process.returncode}")
+
+    def __enter__(self) -> "AnimationWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+_renderer: Optional[FrameRenderer] = None
+_recorder: Optional[FieldRecorder] = None
+
+
+def _init_renderer(recorder: FieldRecorder, *args) -> None:
+    global _renderer, _recorder
+    _recorder = recorder
+    _renderer = FrameRenderer(recorder.cell_vertices(), *args)
+
+
+def _render(i: int) -> np.ndarray:
+    return _renderer.render(_recorder.frame(i), f"Time {i}")
+
+
+def render_frames(
+        recorder: FieldRecorder,
+        axes_sizes: tuple[float, float, float, float],
+        workers: int = 1,
+        max_value: Optional[float] = None,
+        figsize: tuple[float, float] = (6.4, 4.8),
+        dpi: int = 100
+) -> Iterator[np.ndarray]:
+    """
+    RGBA images of all recorded frames in order. With `workers` > 1 frames are rendered
+    in worker processes and yielded as soon as they are ready.
+    """
+    if max_value is None:
+        max_value = recorder.max_value()
+    args = (axes_sizes, max_value, figsize, dpi)
+    if workers <= 1:
+        renderer = FrameRenderer(recorder.cell_vertices(), *args)
+        for i in range(recorder.frame_count):
+            yield renderer.render(recorder.frame(i), f"Time {i}")
+        return
+
+    with multiprocessing.get_context().Pool(workers, initializer=_init_renderer, initargs=(recorder,) + args) as pool:
+        yield from pool.imap(_render, range(recorder.frame_count), chunksize=4)
+
+
+def save_animation(
+        path: str,
+        recorder: FieldRecorder,
+        axes_sizes: tuple[float, float, float, float],
+        fps: int = 15,
+        workers: int = 1,
+        max_value: Optional[float] = None
+) -> None:
+    """
+    Stream the recorded frames to a .gif (Pillow) or .mp4 (ffmpeg on PATH) file.
+    """
+    with AnimationWriter(path, fps) as writer:
+        for frame in render_frames(recorder, axes_sizes, workers, max_value):
+            writer.write(frame)
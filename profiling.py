@@ -0,0 +1,142 @@
+import functools
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+#  методы, выполняющие один шаг по времени: по числу их вызовов считается пропускная способность
+STEP_PHASES = ("calc", "calc_vectorized", "calc_jacobi", "calc_runge_kutta", "calc_implicit")
+
+PhaseHook = Callable[[str, float], None]
+
+
+@dataclass
+class PhaseStats:
+    calls: int = 0
+    total: float = 0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.calls if self.calls else 0
+
+
+class SolverProfiler:
+    """
+    Cumulative wall time and call count of solver phases.
+
+    Phases are methods of one solver instance replaced by timing wrappers in `attach`;
+    `detach` restores the plain methods, so a solver without a profiler pays nothing.
+    Times of nested phases are inclusive (`run_physics` contains `calc_*`).
+
+    Parameters
+    ----------
+    trace_memory
+        Track the peak of Python/numpy allocations with tracemalloc (slows allocations down).
+    """
+
+    PHASES = (
+        "build_mesh", "set_initial_boundary", "build_operators",
+        "run_physics", "set_periodic_boundary", *STEP_PHASES,
+    )
+
+    def __init__(self, trace_memory: bool = False):
+        self.stats: dict[str, PhaseStats] = dict()
+        self.hooks: list[PhaseHook] = []
+        self.trace_memory: bool = trace_memory
+        self.element_count: int = 0
+        self._solver = None
+        self._started_tracing: bool = False
+        self._traced_peak: Optional[int] = None
+
+    def add_hook(self, hook: PhaseHook) -> None:
+        """
+        Call `hook(phase, elapsed)` after every timed call.
+        """
+        self.hooks.append(hook)
+
+    def attach(self, solver) -> None:
+        if self._solver is not None:
+            raise ValueError("Profiler is already attached to a solver")
+        self._solver = solver
+        for name in self.PHASES:
+            setattr(solver, name, self._wrap(name, getattr(solver, name)))
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def detach(self) -> None:
+        if self._solver is None:
+            return
+        self.element_count = self._solver.element_count
+        for name in self.PHASES:
+            #  удаляем обёртку экземпляра, снова виден метод класса
+            self._solver.__dict__.pop(name, None)
+        self._solver = None
+        if self._started_tracing:
+            self._traced_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _wrap(self, name: str, method: Callable) -> Callable:
+        stats = self.stats.setdefault(name, PhaseStats())
+        hooks = self.hooks
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                stats.calls += 1
+                stats.total += elapsed
+                for hook in hooks:
+                    hook(name, elapsed)
+
+        return timed
+
+    def reset(self) -> None:
+        for stats in self.stats.values():
+            stats.calls = 0
+            stats.total = 0
+        if self._started_tracing:
+            tracemalloc.reset_peak()
+
+    @property
+    def step_count(self) -> int:
+        return sum(self.stats[name].calls for name in STEP_PHASES if name in self.stats)
+
+    @property
+    def step_time(self) -> float:
+        return sum(self.stats[name].total for name in STEP_PHASES if name in self.stats)
+
+    def report(self) -> dict:
+        """
+        Phases as {name: {calls, total_s, mean_s}}, step throughput and peak memory.
+        """
+        element_count = self._solver.element_count if self._solver is not None else self.element_count
+        step_time = self.step_time
+        report = {
+            "phases": {
+                name: {"calls": stats.calls, "total_s": stats.total, "mean_s": stats.mean}
+                for name, stats in self.stats.items() if stats.calls
+            },
+            "element_count": element_count,
+            "steps": self.step_count,
+            "element_steps_per_s": element_count * self.step_count / step_time if step_time > 0 else 0,
+        }
+        if resource is not None:
+            #  ru_maxrss в килобайтах в Linux и в байтах в macOS
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            report["peak_rss_mb"] = max_rss / (2 ** 20 if sys.platform == "darwin" else 2 ** 10)
+        if self._started_tracing:
+            report["traced_peak_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        elif self._traced_peak is not None:
+            report["traced_peak_mb"] = self._traced_peak / 2 ** 20
+        return report
@@ -0,0 +1,142 @@
+from typing import Optional
+
+import numpy as np
+
+from mesh_arrays import MeshArrays
+
+
+class FieldRecorder:
+    """
+    History of the field `u` over time steps.
+
+    The mesh geometry is kept once; every recorded step stores only the `u` vector.
+
+    Parameters
+    ----------
+    mesh
+        Mesh of the solver, its points and cell vertices are kept as the static geometry.
+    capacity
+        Number of frames preallocated. In memory the buffer grows when it is full,
+        unless `ring` is set; a file-backed recorder cannot grow.
+    every
+        Record only steps whose iteration number is a multiple of `every`.
+    dtype
+        Storage type of the frames, e.g. np.float32 to halve the memory.
+    ring
+        Keep only the last `capacity` frames.
+    path
+        Store the frames in a memory-mapped .npy file instead of memory.
+    """
+
+    def __init__(
+            self,
+            mesh: MeshArrays,
+            capacity: int = 256,
+            every: int = 1,
+            dtype: type = np.float64,
+            ring: bool = False,
+            path: Optional[str] = None
+    ):
+        if ring and path is not None:
+            raise ValueError("Ring buffer is supported in memory only")
+        self.points: np.ndarray = np.asarray(mesh.points)
+        self.cell_offsets: np.ndarray = mesh.slot_offsets
+        self.cell_points: np.ndarray = mesh.slot_point
+        self._cell_vertices: Optional[list[np.ndarray]] = None
+        self.every: int = every
+        self.ring: bool = ring
+        self.path: Optional[str] = path
+
+        frame_shape = (mesh.element_count,)
+        if path is None:
+            self._frames: np.ndarray = np.empty((capacity,) + frame_shape, dtype=dtype)
+        else:
+            self._frames = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(capacity,) + frame_shape)
+        self._iterations: np.ndarray = np.empty(capacity, dtype=np.int64)
+        self._times: np.ndarray = np.empty(capacity, dtype=np.float64)
+        self._count: int = 0  # записано всего, включая вытесненные из кольца
+
+    @property
+    def capacity(self) -> int:
+        return len(self._frames)
+
+    @property
+    def frame_count(self) -> int:
+        return min(self._count, self.capacity) if self.ring else self._count
+
+    def on_step(self, solver) -> None:
+        if solver.iteration_count % self.every == 0:
+            self.record(solver.u, solver.iteration_count, solver.time)
+
+    def record(self, u: np.ndarray, iteration: int = 0, time: float = 0) -> None:
+        if self._count >= self.capacity and not self.ring:
+            if self.path is not None:
+                raise IndexError(f"File-backed recorder is full ({self.capacity} frames)")
+            self._grow()
+        slot = self._count % self.capacity
+        self._frames[slot] = u
+        self._iterations[slot] = iteration
+        self._times[slot] = time
+        self._count += 1
+
+    def _grow(self) -> None:
+        capacity = max(2 * self.capacity, 1)
+        for name in ("_frames", "_iterations", "_times"):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def _order(self) -> np.ndarray | slice:
+        if self.ring and self._count > self.capacity:
+            return np.roll(np.arange(self.capacity), -(self._count % self.capacity))
+        return slice(0, self.frame_count)
+
+    def frames(self) -> np.ndarray:
+        """
+        Recorded frames in time order, (frame_count, element_count).
+        """
+        return self._frames[self._order()]
+
+    def frame(self, i: int) -> np.ndarray:
+        """
+        Frame `i` in time order; negative `i` counts from the last recorded frame.
+        """
+        if not -self.frame_count <= i < self.frame_count:
+            raise IndexError(f"Frame {i} out of range, {self.frame_count} frames recorded")
+        i %= self.frame_count
+        order = self._order()
+        return self._frames[order[i] if isinstance(order, np.ndarray) else i]
+
+    def iterations(self) -> np.ndarray:
+        return self._iterations[self._order()]
+
+    def times(self) -> np.ndarray:
+        return self._times[self._order()]
+
+    def max_value(self) -> float:
+        return float(np.max(self.frames(), initial=0))
+
+    def cell_vertices(self) -> list[np.ndarray]:
+        """
+        Vertex coordinates of every element, (vertex_count, 2) each.
+        """
+        if self._cell_vertices is None:
+            xy = self.points.T[self.cell_points]
+            self._cell_vertices = np.split(xy, self.cell_offsets[1:-1])
+        return self._cell_vertices
+
+    def flush(self) -> None:
+        if isinstance(self._frames, np.memmap):
+            self._frames.flush()
+
+    def save(self, path: str) -> None:
+        np.savez(
+            path,
+            points=self.points,
+            cell_offsets=self.cell_offsets,
+            cell_points=self.cell_points,
+            frames=self.frames(),
+            iterations=self.iterations(),
+            times=self.times(),
+        )
@@ -1,33 +1,289 @@
-from typing import Optional
+import os
+from enum import Enum
+from typing import Callable, Optional
 
-from element import Element, Face, BoundaryType
-from loader import load_from_file
-from math_2d import Vector2D
-from periodic_boundary import periodic_boundary_condition
+import numpy as np
+from scipy.sparse import csc_array, csr_array, diags_array, eye_array
+from scipy.sparse.linalg import LinearOperator, SuperLU, bicgstab, spilu, splu, spsolve_triangular
+
+from element import Element, Face
+from mesh_arrays import MeshArrays, NodeWeights
+from mesh_reorder import Ordering, element_order
+from periodic_boundary import BoundaryTable, CompiledBoundary, boundary_table
+from profiling import SolverProfiler
+from recorder import FieldRecorder
+from spatial_index import CellLocator
+
+
+class TimeScheme(Enum):
+    explicit = 0  # явная схема, как в calc
+    backward_euler = 1  # неявная схема Эйлера
+    crank_nicolson = 2  # схема Кранка-Николсон
+    jacobi = 3  # явная схема, все элементы обновляются по значениям предыдущего шага
+    ssp_rk2 = 4  # SSP метод Рунге-Кутты 2 порядка (Хойна)
+    ssp_rk3 = 5  # SSP метод Рунге-Кутты 3 порядка (Шу-Ошер)
+    rk4 = 6  # классический метод Рунге-Кутты 4 порядка
+
+
+RUNGE_KUTTA_SCHEMES = (TimeScheme.ssp_rk2, TimeScheme.ssp_rk3, TimeScheme.rk4)
+EXPLICIT_SCHEMES = (TimeScheme.explicit, TimeScheme.jacobi) + RUNGE_KUTTA_SCHEMES
+
+
+def runge_kutta_step(
+        scheme: TimeScheme,
+        u: np.ndarray,
+        time: float,
+        delta: float,
+        rhs: Callable[[np.ndarray, float], np.ndarray]
+) -> np.ndarray:
+    """
+    One step of `scheme` for du/dt = rhs(u, t); `u` may hold one field per column.
+    """
+    if scheme == TimeScheme.ssp_rk2:
+        u1 = u + delta * rhs(u, time)
+        return 0.5 * u + 0.5 * (u1 + delta * rhs(u1, time + delta))
+    if scheme == TimeScheme.ssp_rk3:
+        u1 = u + delta * rhs(u, time)
+        u2 = 0.75 * u + 0.25 * (u1 + delta * rhs(u1, time + delta))
+        return u / 3 + (2 / 3) * (u2 + delta * rhs(u2, time + 0.5 * delta))
+    if scheme == TimeScheme.rk4:
+        k1 = rhs(u, time)
+        k2 = rhs(u + (0.5 * delta) * k1, time + 0.5 * delta)
+        k3 = rhs(u + (0.5 * delta) * k2, time + 0.5 * delta)
+        k4 = rhs(u + delta * k3, time + delta)
+        return u + (delta / 6) * (k1 + 2 * (k2 + k3) + k4)
+    raise ValueError(f"{scheme} is not a Runge-Kutta scheme")
+
+CHECKPOINT_VERSION = 1
 
 
 class HeatEquationSolver:
-    def __init__(self, domain: str):
+    def __init__(self, domain: str, vectorized: bool = True, scheme: TimeScheme = TimeScheme.explicit):
         self.element_count: int = 0
-        self.elements: list[Element] = list()
-        self.faces: list[Face] = list()
-        self.bound_faces: list[Face] = list()
+        #  объекты Element и Face строятся из массивов по запросу
+        self._elements: Optional[list[Element]] = None
+        self._faces: Optional[list[Face]] = None
+        self._bound_faces: Optional[list[Face]] = None
         self.node_count: int = 0
         self.delta: float = 0
         self.domain: str = domain
+        #  граничные условия; None - таблица домена из periodic_boundary.BOUNDARY_TABLES
+        self.boundary_conditions: Optional[BoundaryTable] = None
+        self.boundary_value: Optional[float] = None  # горячая температура границы, None - по умолчанию домена
+        self._boundary: Optional[CompiledBoundary] = None
+        self._bc: Optional[np.ndarray] = None
         self.iteration_count: int = 0
+        self.time: float = 0  # модельное время, сумма шагов delta
+
+        #  адаптивный шаг по времени, см. set_time_step
+        self.adaptive_step: bool = False
+        self.cfl_safety: float = 0.9
+        self.target_change: float = 1.0
+        self.step_growth: float = 1.2
+        self.max_delta: Optional[float] = None
+
+        #  массивы сетки; после create_volume_decomposition поле u хранится здесь
+        self.vectorized: bool = vectorized
+        self.mesh: Optional[MeshArrays] = None
+        self.element_ids: Optional[np.ndarray] = None  # исходный номер каждого элемента после reorder
+        #  поиск элементов по точкам, строится при первом probe
+        self._locator: Optional[CellLocator] = None
+        self._probe_points: Optional[np.ndarray] = None
+        self._probe_cells: Optional[np.ndarray] = None
+        #  интерполяция в вершины сетки, строится при первом node_values
+        self._node_matrix: Optional[csr_array] = None
+        self._node_weights: Optional[NodeWeights] = None
+        self._node_boundary: Optional[tuple[csr_array, np.ndarray]] = None
+        self.u: np.ndarray = np.zeros(0, dtype=np.float64)
+        self._views_stale: bool = False
+        self._ac: np.ndarray = np.zeros(0, dtype=np.float64)
+        self._upper: Optional[csr_array] = None
+        self._lower: Optional[csc_array] = None
+        self._lower_step: Optional[csc_array] = None
+        self._lower_step_delta: float = 0
+
+        self.recorder: Optional[FieldRecorder] = None
+        self.profiler: Optional[SolverProfiler] = None
+        #  автоматическое сохранение состояния, см. set_checkpointing
+        self.checkpoint_path: Optional[str] = None
+        self.checkpoint_every: int = 0
+
+        #  du/dt = bc - operator @ u
+        self.scheme: TimeScheme = scheme
+        self.operator: Optional[csr_array] = None
+        self._factor: Optional[SuperLU] = None
+        self._factor_key: Optional[tuple[TimeScheme, float]] = None
+
+    @property
+    def elements(self) -> list[Element]:
+        """
+        Element objects built from the arrays on first access; `u` is refreshed on every access.
+        Empty before the mesh is built.
+        """
+        if self.mesh is None:
+            return []
+        self.sync_views()
+        return self._elements
+
+    @property
+    def faces(self) -> list[Face]:
+        if self.mesh is None:
+            return []
+        self.sync_views()
+        return self._faces
+
+    @property
+    def bound_faces(self) -> list[Face]:
+        if self.mesh is None:
+            return []
+        self.sync_views()
+        return self._bound_faces
+
+    def build_views(self) -> None:
+        self._elements, self._faces, self._bound_faces = self.mesh.to_objects(self.u)
+        self._views_stale = False
+
+    def sync_views(self) -> None:
+        if self._elements is None:
+            self.build_views()
+        elif self._views_stale:
+            for elem, u in zip(self._elements, self.u.tolist()):
+                elem.u = u
+            for face in self._bound_faces:
+                face.bound_u = float(self.mesh.bound_u[face.id])
+            self._views_stale = False
+
+    def attach_recorder(self, recorder: Optional[FieldRecorder]) -> None:
+        """
+        Record the field after every step of `run_physics` (subject to the recorder decimation).
+        Any object with `on_step(solver)` is accepted, e.g. `frame_export.FrameExporter`.
+        """
+        self.recorder = recorder
+
+    def set_u(self, u: np.ndarray) -> None:
+        self.u = np.asarray(u, dtype=np.float64)
+        self._views_stale = True
 
     def set_initial_boundary(self) -> None:
-        for e in range(self.element_count):
-            self.elements[e].u = 0
-        self.set_periodic_boundary()
+        self.u = np.zeros(self.element_count, dtype=np.float64)
+        self._views_stale = True
+        self.compile_boundary()
+
+    def set_boundary_conditions(self, table: Optional[BoundaryTable] = None, value: Optional[float] = None) -> None:
+        """
+        Replace the boundary table and/or its hot temperature and recompile the boundary values.
+        """
+        self.boundary_conditions = table
+        self.boundary_value = value
+        if self.mesh is not None:
+            self.compile_boundary()
+
+    def compile_boundary(self) -> None:
+        mesh = self.mesh
+        table = self.boundary_conditions if self.boundary_conditions is not None else boundary_table(self.domain)
+        self._boundary = table.compile(
+            mesh.face_count, mesh.bound_face, mesh.bound_domain, mesh.bound_group, self.boundary_value
+        )
+        mesh.bound_u[:] = self._boundary.initial(self.time)
+        self._bc = None
+        self._views_stale = True
+
+    @property
+    def boundary_is_static(self) -> bool:
+        return self._boundary is None or self._boundary.is_static
 
     def set_periodic_boundary(self) -> None:
-        for face in self.bound_faces:
-            face.set_boundary(
-                BoundaryType.const_bound,
-                periodic_boundary_condition(self.domain, face.bound_domain, face.bound_group)
+        """
+        Re-evaluate time-dependent boundary rules at the current model time; static boundaries cost nothing.
+        """
+        if self._boundary is None or self._boundary.is_static:
+            return
+        self._boundary.apply(self.mesh.bound_u, self.time)
+        self._bc = None
+        self._views_stale = True
+
+    def boundary_source(self) -> np.ndarray:
+        if self._bc is None:
+            self._bc = self.mesh.boundary_source()
+        return self._bc
+
+    def build_operators(self) -> None:
+        self._ac = self.mesh.diagonal()
+        #  соседи с меньшим номером в calc уже обновлены на текущем шаге
+        self._upper = self.mesh.neighbour_matrix(self.mesh.slot_neighbour > self.mesh.slot_cell).tocsr()
+        self._lower = self.mesh.neighbour_matrix(self.mesh.slot_neighbour < self.mesh.slot_cell).tocsc()
+        self._lower_step = None
+        self.operator = csr_array(diags_array(self._ac) + self.mesh.neighbour_matrix())
+        self._factor = None
+        self._factor_key = None
+
+    def calc_vectorized(self) -> None:
+        """
+        Array version of `calc`.
+
+        `calc` updates elements in place, so neighbours with a smaller id already hold the
+        new value. The same sweep is written as (I + delta * L) u_new = rhs with L the
+        lower triangular part of the flux matrix, and solved with one sparse triangular solve.
+        """
+        if self._lower_step is None or self._lower_step_delta != self.delta:
+            self._lower_step = csc_array(
+                eye_array(self.element_count, format="csc") + self.delta * self._lower
             )
+            self._lower_step_delta = self.delta
+
+        u = self.u
+        bc = self.boundary_source()
+        rhs = u + self.delta * (bc - self._upper @ u - self._ac * u)
+        self.u = spsolve_triangular(self._lower_step, rhs, lower=True, unit_diagonal=True, overwrite_b=True)
+        self._views_stale = True
+
+    def calc_jacobi(self) -> None:
+        """
+        Explicit step where every element sees the neighbour values of the previous step,
+        so elements can be updated in any order or in parallel.
+        """
+        u = self.u
+        self.u = u + self.delta * (self.boundary_source() - self.operator @ u)
+        self._views_stale = True
+
+    def calc_runge_kutta(self) -> None:
+        """
+        Step of an SSP-RK2/SSP-RK3/RK4 scheme with the same operator as `calc_jacobi`;
+        time-dependent boundaries are evaluated at the stage times.
+        """
+        mesh = self.mesh
+        static = self.boundary_is_static
+
+        def rhs(u: np.ndarray, time: float) -> np.ndarray:
+            if static or time == self.time:
+                bc = self.boundary_source()
+            else:
+                bound_u = mesh.bound_u.copy()
+                self._boundary.apply(bound_u, time)
+                bc = mesh.boundary_source(bound_u)
+            return bc - self.operator @ u
+
+        self.u = runge_kutta_step(self.scheme, self.u, self.time, self.delta, rhs)
+        self._views_stale = True
+
+    def calc_implicit(self) -> None:
+        """
+        Backward Euler or Crank-Nicolson step with the operator factorized once per delta.
+        """
+        theta = 1 if self.scheme == TimeScheme.backward_euler else 0.5
+        key = (self.scheme, self.delta)
+        if self._factor is None or self._factor_key != key:
+            # operator is not symmetric on general meshes, so LU instead of Cholesky
+            matrix = eye_array(self.element_count, format="csc") + (theta * self.delta) * self.operator
+            self._factor = splu(csc_array(matrix))
+            self._factor_key = key
+
+        u = self.u
+        rhs = u + self.delta * self.boundary_source()
+        if theta != 1:
+            rhs -= ((1 - theta) * self.delta) * (self.operator @ u)
+        self.u = self._factor.solve(rhs)
+        self._views_stale = True
 
     def calc(self):
         bc: float = 0
@@ -53,83 +309,361 @@ class HeatEquationSolver:
                     aa[num_face] = -elem.flux[num_face]
             elem.u = elem.u + self.delta * (bc - sumflux - ac * elem.u)
 
-    def set_parameters(self):
-        self.delta = 0.015
+        self.u = np.array([elem.u for elem in self._elements], dtype=np.float64)
+
+    def set_parameters(self, delta: float = 0.015):
+        self.delta = delta
+
+    def stable_delta(self, safety: float = 0.9) -> float:
+        """
+        Largest explicit step keeping the update of `calc` a convex combination of old values.
+
+        The update of `calc` does not divide by the element volume, so the bound is
+        delta * sum |flux| <= 1 for every element.
+        """
+        if self.mesh is None or len(self._ac) != self.element_count:
+            raise RuntimeError("mesh not built: call create_volume_decomposition first")
+        return safety / float(np.max(self._ac))
+
+    def set_time_step(
+            self,
+            delta: Optional[float] = None,
+            safety: float = 0.9,
+            adaptive: bool = False,
+            target_change: float = 1.0,
+            growth: float = 1.2,
+            max_delta: Optional[float] = None
+    ) -> None:
+        """
+        Parameters
+        ----------
+        delta
+            Initial step, the CFL-stable step with `safety` if not given.
+        safety
+            Fraction of the stable explicit step that may be used.
+        adaptive
+            Grow the step by `growth` while max |du| per step is below half of `target_change`
+            and shrink it when the change exceeds `target_change`.
+        max_delta
+            Upper bound of the adaptive step. Explicit scheme is always capped by the stable step.
+        """
+        self.cfl_safety = safety
+        self.delta = self.stable_delta(safety) if delta is None else delta
+        self.adaptive_step = adaptive
+        self.target_change = target_change
+        self.step_growth = growth
+        self.max_delta = max_delta
+
+    def adapt_delta(self, change: float) -> None:
+        if change < 0.5 * self.target_change:
+            delta = self.delta * self.step_growth
+        elif change > self.target_change:
+            delta = self.delta / self.step_growth
+        else:
+            return
+        if self.scheme in EXPLICIT_SCHEMES:
+            delta = min(delta, self.stable_delta(self.cfl_safety))
+        if self.max_delta is not None:
+            delta = min(delta, self.max_delta)
+        self.delta = delta
 
     def create_volume_decomposition(
             self,
             points: list[list[float | int]],
             polys:  list[list[float | int]],
-            bound:  list[list[float | int]]
+            bound:  list[list[float | int]],
+            k: float = 1
     ):
-        face_dict: dict[str, Face] = dict()
-
         self.set_parameters()
+        self.build_mesh(points, polys, bound, k)
+        self.set_initial_boundary()
+        self.build_operators()
 
-        self.element_count = len(polys[0])
-        vertex_count: int = len(polys) - 1
-        self.elements: list[Element] = [None for _ in range(self.element_count)]
-
-        face_id: int = 0
-        for e in range(self.element_count):
-            self.elements[e] = Element(vertex_count)
-            self.elements[e].id = e
-            self.elements[e].k = 1
-
-            vertex: list[Vector2D] = [None for _ in range(vertex_count)]
-            for v in range(vertex_count):
-                p1_index: int = int(polys[v][e])  # first point index
-                p2_index = int(polys[(v + 1) % vertex_count][e])  # second point index
-
-                vertex[v] = Vector2D(points[0][p1_index], points[1][p1_index])
-                face_str = Face.get_face_str_id(p1_index, p2_index)
-
-                if not face_str in face_dict.keys():
-                    face: Face = Face(
-                        Vector2D(points[0][p1_index], points[1][p1_index]),
-                        Vector2D(points[0][p2_index], points[1][p2_index])
-                    )
-                    face.id = face_id
-                    face.point_id_1 = p1_index
-                    face.point_id_2 = p2_index
-                    face.owner = self.elements[e]
-                    face_id += 1
-                    face_dict[face_str] = face
-                    self.elements[e].faces[v] = face
-                else:
-                    face: Face = face_dict[face_str]
-                    face.neighbour_elem = self.elements[e]
-                    self.elements[e].faces[v] = face
-                    owner: Element = face.owner
-                    self.elements[e].neighbours[v] = owner
-                    owner.neighbours[owner.face_local_id(face)] = self.elements[e]
+    def build_mesh(
+            self,
+            points: list[list[float | int]],
+            polys:  list[list[float | int]],
+            bound:  list[list[float | int]],
+            k: float = 1
+    ) -> None:
+        self.set_mesh(MeshArrays.from_polygons(points, polys, bound, k=k))
+        self.element_ids = None
 
-            self.elements[e].set_polygon(vertex)
-            self.elements[e].precalc()
+    def set_mesh(self, mesh: MeshArrays) -> None:
+        """
+        Use the decomposition `mesh` and drop everything derived from the previous one.
+        """
+        self.mesh = mesh
+        self.element_count = mesh.element_count
+        self.node_count = np.asarray(mesh.points).shape[1]
+        self._elements = None
+        self._faces = None
+        self._bound_faces = None
+        self._locator = None
+        self._probe_points = None
+        self._node_matrix = None
+        self._node_boundary = None
 
-        self.faces: list[Optional[Face]] = [None for _ in range(len(face_dict))]
-        self.bound_faces: list[Optional[Face]] = [None for _ in range(len(bound[0]))]
+    def replace_mesh(
+            self,
+            points: list[list[float | int]],
+            polys:  list[list[float | int]],
+            bound:  list[list[float | int]],
+            u: np.ndarray,
+            k: float = 1
+    ) -> None:
+        """
+        Continue on another mesh of the domain (e.g. after `mesh_refine.AdaptiveMesh.adapt`) with the field `u`.
+        Time, step and boundary conditions are kept; an attached recorder must match the new element count.
+        """
+        self.build_mesh(points, polys, bound, k)
+        self.compile_boundary()
+        self.build_operators()
+        self.set_u(u)
 
-        for key, value in face_dict.items():
-            self.faces[value.id] = value
+    def reorder(self, ordering: Ordering = Ordering.rcm) -> None:
+        """
+        Renumber elements and faces for memory locality of neighbour accesses.
 
-        for e in range(self.element_count):
-            self.elements[e].calc()
+        `element_ids` keeps the original number of every element, `original_order` maps fields back.
+        The in-place sweep of `TimeScheme.explicit` follows the element order, so its results
+        change slightly; the other schemes are not affected beyond rounding.
+        Recorders keep the cell geometry of the mesh they were created for, so reorder before
+        creating and attaching one.
+        """
+        if self.recorder is not None:
+            raise RuntimeError("Cannot reorder with an attached recorder, its frames would not match the cells")
+        order = element_order(self.mesh, ordering)
+        self.set_mesh(self.mesh.permute(order))
+        self.element_ids = order if self.element_ids is None else self.element_ids[order]
+        self.compile_boundary()
+        self.build_operators()
+        self.set_u(self.u[order])
 
-        for f in range(len(bound[0])):
-            face_str = Face.get_face_str_id(int(bound[0][f]), int(bound[1][f]))
-            face: Face = face_dict[face_str]
-            face.bound_domain = int(bound[5][f])
-            face.bound_group = int(bound[4][f])
-            face.is_boundary = True
-            self.bound_faces[f] = face
+    def original_order(self, u: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Field `u` (the solver field by default) in the element numbering of the input mesh.
+        """
+        u = self.u if u is None else u
+        if self.element_ids is None:
+            return u.copy()
+        result = np.empty_like(u)
+        result[self.element_ids] = u
+        return result
 
-        self.set_initial_boundary()
+    def locate(self, points: np.ndarray) -> np.ndarray:
+        """
+        Element containing each of the (N, 2) points, -1 outside the mesh.
+        """
+        if self._locator is None:
+            self._locator = CellLocator(self.mesh)
+        return self._locator.locate(points)
 
-        for elem in self.elements:
-            elem.calc_fluxes()
+    def probe(self, points: np.ndarray, outside: float = np.nan) -> np.ndarray:
+        """
+        Temperature of the elements containing the (N, 2) points, `outside` for points outside the mesh.
 
-    def run_physics(self) -> None:
-        self.iteration_count += 1
+        The elements of the last probed points are kept, so probing the same sensors every step is a gather.
+        """
+        points = np.asarray(points, dtype=np.float64)
+        if self._probe_points is None or not np.array_equal(self._probe_points, points):
+            self._probe_cells = self.locate(points)
+            self._probe_points = points.copy()
+        cells = self._probe_cells
+        return np.where(cells >= 0, self.u[np.maximum(cells, 0)], outside)
+
+    def node_values(
+            self,
+            u: Optional[np.ndarray] = None,
+            weights: NodeWeights = NodeWeights.inverse_distance,
+            use_boundary: bool = True
+    ) -> np.ndarray:
+        """
+        Field `u` (the solver field by default) interpolated to the mesh vertices with one sparse product.
+
+        With `use_boundary` the vertices on the boundary take the mean temperature of their boundary faces.
+        """
+        u = self.u if u is None else u
+        if self._node_matrix is None or self._node_weights != weights:
+            self._node_matrix = self.mesh.node_matrix(weights)
+            self._node_weights = weights
+        values = self._node_matrix @ u
+        if use_boundary:
+            if self._node_boundary is None:
+                self._node_boundary = self.mesh.node_boundary_matrix()
+            self.mesh.set_node_boundary(values, self._node_boundary)
+        return values
+
+    def enable_profiling(self, profiler: Optional[SolverProfiler] = None, trace_memory: bool = False) -> SolverProfiler:
+        """
+        Time the setup and step phases of this solver; see `profiling.SolverProfiler.report`.
+        """
+        self.disable_profiling()
+        self.profiler = profiler if profiler is not None else SolverProfiler(trace_memory)
+        self.profiler.attach(self)
+        return self.profiler
+
+    def disable_profiling(self) -> None:
+        if self.profiler is not None:
+            self.profiler.detach()
+            self.profiler = None
+
+    def save_checkpoint(self, path: str) -> None:
+        """
+        Write the field, the step state and the mesh arrays to an uncompressed .npz file.
+
+        The file is written next to `path` and moved over it, so an interrupted save keeps the previous checkpoint.
+        Boundary tables are not stored: `load_checkpoint` takes them from the domain or from its argument.
+        """
+        state = {
+            "checkpoint_version": np.int64(CHECKPOINT_VERSION),
+            "domain": np.str_(self.domain),
+            "scheme": np.str_(self.scheme.name),
+            "vectorized": np.bool_(self.vectorized),
+            "u": self.u,
+            "iteration_count": np.int64(self.iteration_count),
+            "time": np.float64(self.time),
+            "delta": np.float64(self.delta),
+            "adaptive_step": np.bool_(self.adaptive_step),
+            "cfl_safety": np.float64(self.cfl_safety),
+            "target_change": np.float64(self.target_change),
+            "step_growth": np.float64(self.step_growth),
+            "max_delta": np.float64(np.nan if self.max_delta is None else self.max_delta),
+            "boundary_value": np.float64(np.nan if self.boundary_value is None else self.boundary_value),
+        }
+        for name, value in self.mesh.to_arrays().items():
+            state["mesh_" + name] = value
+        if self.element_ids is not None:
+            state["element_ids"] = self.element_ids
+
+        temporary = f"{path}.tmp{os.getpid()}"
+        try:
+            with open(temporary, "wb") as file:
+                np.savez(file, **state)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary, path)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+    @staticmethod
+    def load_checkpoint(path: str, boundary_conditions: Optional[BoundaryTable] = None) -> "HeatEquationSolver":
+        """
+        Solver in the state saved by `save_checkpoint`, without rebuilding the mesh decomposition.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["checkpoint_version"]) != CHECKPOINT_VERSION:
+                raise ValueError(f"Unsupported checkpoint version {int(data['checkpoint_version'])} in {path}")
+            solver = HeatEquationSolver(
+                str(data["domain"]), vectorized=bool(data["vectorized"]), scheme=TimeScheme[str(data["scheme"])]
+            )
+            solver.set_mesh(MeshArrays.from_arrays(
+                {name[len("mesh_"):]: data[name] for name in data.files if name.startswith("mesh_")}
+            ))
+            if "element_ids" in data.files:
+                solver.element_ids = data["element_ids"]
+            solver.set_u(data["u"])
+            solver.iteration_count = int(data["iteration_count"])
+            solver.time = float(data["time"])
+            solver.delta = float(data["delta"])
+            solver.adaptive_step = bool(data["adaptive_step"])
+            solver.cfl_safety = float(data["cfl_safety"])
+            solver.target_change = float(data["target_change"])
+            solver.step_growth = float(data["step_growth"])
+            max_delta = float(data["max_delta"])
+            solver.max_delta = None if np.isnan(max_delta) else max_delta
+            boundary_value = float(data["boundary_value"])
+            solver.boundary_value = None if np.isnan(boundary_value) else boundary_value
+
+        bound_u = solver.mesh.bound_u.copy()
+        solver.boundary_conditions = boundary_conditions
+        solver.compile_boundary()
+        solver.mesh.bound_u[:] = bound_u
+        solver.build_operators()
+        return solver
+
+    def set_checkpointing(self, path: Optional[str], every: int = 100) -> None:
+        """
+        Save a checkpoint to `path` every `every` iterations of `run_physics`; None turns it off.
+        """
+        if path is not None and every < 1:
+            raise ValueError("Checkpoint interval must be positive")
+        self.checkpoint_path = path
+        self.checkpoint_every = every
+
+    def solve_steady_state(self, method: str = "direct", tol: float = 1e-10, maxiter: Optional[int] = None) -> np.ndarray:
+        """
+        Solve operator @ u = bc for the equilibrium temperature.
+
+        Parameters
+        ----------
+        method
+            "direct" for sparse LU, "iterative" for BiCGSTAB with an incomplete LU preconditioner
+            (the operator is not symmetric, so plain CG is not applicable).
+        tol
+            Relative residual tolerance of the iterative method.
+        maxiter
+            Iteration limit of the iterative method.
+
+        Returns
+        -------
+        Equilibrium field, also stored in `u`.
+        """
         self.set_periodic_boundary()
-        self.calc()
+        matrix = csc_array(self.operator)
+        bc = self.boundary_source()
+        match method:
+            case "direct":
+                u = splu(matrix).solve(bc)
+            case "iterative":
+                ilu = spilu(matrix)
+                preconditioner = LinearOperator(matrix.shape, ilu.solve)
+                u, info = bicgstab(matrix, bc, x0=self.u, rtol=tol, maxiter=maxiter, M=preconditioner)
+                if info != 0:
+                    raise RuntimeError(f"Steady state solver did not converge, info = {info}")
+            case _:
+                raise ValueError(f"Unknown steady state method {method}")
+        self.u = u
+        self._views_stale = True
+        return u
+
+    def run_physics(self, n_steps: int = 1, tol: Optional[float] = None) -> int:
+        """
+        Advance `n_steps` time steps.
+
+        If `tol` is given, stop as soon as max |u_new - u| of a step falls below it.
+        Model time `time` advances by the step used, which may change in adaptive mode.
+
+        Returns
+        -------
+        Number of steps done.
+        """
+        for step in range(n_steps):
+            self.iteration_count += 1
+            self.set_periodic_boundary()
+            u_prev = self.u
+            if self.scheme == TimeScheme.jacobi:
+                self.calc_jacobi()
+            elif self.scheme in RUNGE_KUTTA_SCHEMES:
+                self.calc_runge_kutta()
+            elif self.scheme != TimeScheme.explicit:
+                self.calc_implicit()
+            elif self.vectorized:
+                self.calc_vectorized()
+            else:
+                self.calc()
+            self.time += self.delta
+            if self.recorder is not None:
+                self.recorder.on_step(self)
+            if self.checkpoint_path is not None and self.iteration_count % self.checkpoint_every == 0:
+                self.save_checkpoint(self.checkpoint_path)
+            if tol is None and not self.adaptive_step:
+                continue
+            change = float(np.max(np.abs(self.u - u_prev), initial=0))
+            if tol is not None and change < tol:
+                return step + 1
+            if self.adaptive_step:
+                self.adapt_delta(change)
+        return n_steps
+
@@ -0,0 +1,101 @@
+import numpy as np
+
+from mesh_arrays import MeshArrays
+
+
+class CellLocator:
+    """
+    Uniform bucket grid over the element bounding boxes for point location.
+
+    Every element is listed in each bucket its bounding box overlaps; a query point is tested
+    only against the elements of its bucket, all points at once.
+
+    Parameters
+    ----------
+    mesh
+        Decomposition of the solver.
+    elements_per_bucket
+        Average number of elements per bucket the grid is sized for.
+    """
+
+    def __init__(self, mesh: MeshArrays, elements_per_bucket: float = 2):
+        self.mesh: MeshArrays = mesh
+        points = np.asarray(mesh.points)
+        xy = points[:, mesh.slot_point].T  # (slot_count, 2)
+        starts = mesh.slot_offsets[:-1]
+        low = np.minimum.reduceat(xy, starts, axis=0)
+        high = np.maximum.reduceat(xy, starts, axis=0)
+
+        self.origin: np.ndarray = low.min(axis=0)
+        extent = np.maximum(high.max(axis=0) - self.origin, 1e-12)
+        buckets = max(mesh.element_count / elements_per_bucket, 1)
+        size = np.sqrt(extent[0] * extent[1] / buckets)
+        self.shape: np.ndarray = np.maximum(np.ceil(extent / size).astype(np.int64), 1)
+        self.bucket_size: np.ndarray = extent / self.shape
+
+        first = self._bucket_xy(low)
+        last = self._bucket_xy(high)
+        counts = np.prod(last - first + 1, axis=1)
+        element = np.repeat(np.arange(mesh.element_count, dtype=np.int64), counts)
+        #  номер покрываемой ячейки сетки внутри прямоугольника элемента
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        width = (last - first + 1)[element, 0]
+        bx = first[element, 0] + local % width
+        by = first[element, 1] + local // width
+        bucket = by * self.shape[0] + bx
+
+        order = np.argsort(bucket, kind="stable")
+        self.bucket_elements: np.ndarray = element[order]
+        self.bucket_offsets: np.ndarray = np.zeros(self.shape[0] * self.shape[1] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(bucket, minlength=self.shape[0] * self.shape[1]), out=self.bucket_offsets[1:])
+        self._tolerance: float = 1e-10 * float(np.max(extent)) ** 2  # для векторных произведений
+
+    def _bucket_xy(self, xy: np.ndarray) -> np.ndarray:
+        cell = np.floor((xy - self.origin) / self.bucket_size).astype(np.int64)
+        return np.clip(cell, 0, self.shape - 1)
+
+    def locate(self, query: np.ndarray) -> np.ndarray:
+        """
+        Element containing each of the (N, 2) points, -1 for points outside the mesh.
+        Points on a common face go to the element with the smaller number.
+        """
+        query = np.asarray(query, dtype=np.float64).reshape(-1, 2)
+        mesh = self.mesh
+        result = np.full(len(query), -1, dtype=np.int64)
+        inside_box = np.all((query >= self.origin) & (query <= self.origin + self.bucket_size * self.shape), axis=1)
+        point_ids = np.flatnonzero(inside_box)
+        b = self._bucket_xy(query[point_ids])
+        bucket = b[:, 1] * self.shape[0] + b[:, 0]
+
+        #  пары (точка, элемент-кандидат)
+        counts = self.bucket_offsets[bucket + 1] - self.bucket_offsets[bucket]
+        pair_point = np.repeat(point_ids, counts)
+        pair_entry = np.arange(counts.sum()) + np.repeat(
+            self.bucket_offsets[bucket] - (np.cumsum(counts) - counts), counts
+        )
+        pair_element = self.bucket_elements[pair_entry]
+
+        #  точка внутри выпуклого многоугольника, если она по одну сторону от всех его рёбер
+        sizes = np.diff(mesh.slot_offsets)[pair_element]
+        slot_pair = np.repeat(np.arange(len(pair_element)), sizes)
+        slot = np.arange(sizes.sum()) + np.repeat(mesh.slot_offsets[pair_element] - (np.cumsum(sizes) - sizes), sizes)
+        points = np.asarray(mesh.points)
+        p1 = points[:, mesh.slot_point[slot]]
+        cell = mesh.slot_cell[slot]
+        next_slot = np.where(slot + 1 == mesh.slot_offsets[cell + 1], mesh.slot_offsets[cell], slot + 1)
+        p2 = points[:, mesh.slot_point[next_slot]]
+        q = query[pair_point[slot_pair]].T
+        cross = (p2[0] - p1[0]) * (q[1] - p1[1]) - (p2[1] - p1[1]) * (q[0] - p1[0])
+        starts = np.cumsum(sizes) - sizes
+        inside = (
+            (np.minimum.reduceat(cross, starts) >= -self._tolerance) |
+            (np.maximum.reduceat(cross, starts) <= self._tolerance)
+        ) if len(slot) else np.zeros(0, dtype=bool)
+
+        found = np.flatnonzero(inside)
+        order = np.lexsort((pair_element[found], pair_point[found]))
+        found = found[order]
+        first = np.ones(len(found), dtype=bool)
+        first[1:] = pair_point[found[1:]] != pair_point[found[:-1]]
+        result[pair_point[found[first]]] = pair_element[found[first]]
+        return result
@@ -0,0 +1,197 @@
+import os
+from typing import Optional
+
+import numpy as np
+
+from mesh_arrays import MeshArrays
+
+#  коды типов ячеек XDMF для смешанной топологии
+XDMF_POLYGON = 3
+XDMF_TRIANGLE = 4
+XDMF_QUADRILATERAL = 5
+
+XDMF_FOOTER = "  </Grid>\n </Domain>\n</Xdmf>\n"
+
+
+def _data_item(file: str, dimensions: str, dtype: np.dtype, seek: int = 0) -> str:
+    number_type = "Int" if np.issubdtype(dtype, np.integer) else "Float"
+    seek_attribute = f' Seek="{seek}"' if seek else ""
+    return (
+        f'<DataItem Dimensions="{dimensions}" NumberType="{number_type}" Precision="{dtype.itemsize}" '
+        f'Format="Binary" Endian="Little"{seek_attribute}>{file}</DataItem>'
+    )
+
+
+def xdmf_topology(mesh: MeshArrays) -> tuple[str, np.ndarray, str]:
+    """
+    Topology type, connectivity array and its XDMF dimensions.
+    Meshes of one polygon size are written as Triangle/Quadrilateral, other meshes as Mixed.
+    """
+    sizes = np.diff(mesh.slot_offsets)
+    if len(sizes) and np.all(sizes == sizes[0]) and sizes[0] in (3, 4):
+        topology_type = "Triangle" if sizes[0] == 3 else "Quadrilateral"
+        return topology_type, mesh.slot_point.reshape(-1, sizes[0]), f"{len(sizes)} {sizes[0]}"
+
+    #  Mixed: код типа, для многоугольника число вершин, затем вершины
+    header = np.where((sizes == 3) | (sizes == 4), 1, 2)
+    lengths = header + sizes
+    offsets = np.cumsum(lengths) - lengths
+    connectivity = np.empty(lengths.sum(), dtype=np.int64)
+    connectivity[offsets] = np.where(sizes == 3, XDMF_TRIANGLE, np.where(sizes == 4, XDMF_QUADRILATERAL, XDMF_POLYGON))
+    polygon = header == 2
+    connectivity[offsets[polygon] + 1] = sizes[polygon]
+    starts = offsets + header
+    slot_position = np.repeat(starts - mesh.slot_offsets[:-1], sizes) + np.arange(mesh.slot_offsets[-1])
+    connectivity[slot_position] = mesh.slot_point
+    return "Mixed", connectivity, str(len(connectivity))
+
+
+class XdmfWriter:
+    """
+    Time series of the field in XDMF with raw little-endian binary data, readable by ParaView.
+
+    Points and connectivity are written once; every recorded step appends `u` to one binary file
+    and a grid entry to the .xdmf file, which is kept valid after each step. Memory use does not grow
+    with the number of steps. Attach it to a solver with `attach_recorder` or use it as a sink of
+    `frame_export.FrameExporter`.
+
+    Parameters
+    ----------
+    path
+        The .xdmf file; binary files are written next to it with the same stem.
+    mesh
+        Decomposition of the solver.
+    dtype
+        Storage type of the field.
+    every
+        Write only steps whose iteration number is a multiple of `every` (in `on_step`).
+    nodal
+        Also write the field interpolated to the vertices (`MeshArrays.node_matrix`). As a sink of
+        `FrameExporter` create the exporter with `boundary=True`, so the vertices on the boundary
+        follow time-dependent boundary temperatures.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            mesh: MeshArrays,
+            dtype: type = np.float64,
+            every: int = 1,
+            nodal: bool = False
+    ):
+        self.path: str = path
+        self.mesh: MeshArrays = mesh
+        self.dtype: np.dtype = np.dtype(dtype).newbyteorder("<")
+        self.every: int = every
+        self.nodal: bool = nodal
+        self.frame_count: int = 0
+        stem = os.path.splitext(os.path.basename(path))[0]
+        self._files: dict[str, str] = {
+            name: f"{stem}.{name}.bin" for name in ("geometry", "topology", "u", "u_node")
+        }
+        #  файлы открываются при первой записи, чтобы объект можно было передать в другой процесс
+        self._streams: dict = dict()
+        self._grid_template: str = ""
+        self._node_matrix = None
+        self._node_boundary = None
+
+    def _binary_path(self, name: str) -> str:
+        return os.path.join(os.path.dirname(os.path.abspath(self.path)), self._files[name])
+
+    def _open(self) -> None:
+        mesh = self.mesh
+        points = np.ascontiguousarray(np.asarray(mesh.points)[:2].T, dtype="<f8")
+        topology_type, connectivity, dimensions = xdmf_topology(mesh)
+        connectivity = np.ascontiguousarray(connectivity, dtype="<i8")
+        points.tofile(self._binary_path("geometry"))
+        connectivity.tofile(self._binary_path("topology"))
+
+        self._streams["u"] = open(self._binary_path("u"), "wb")
+        if self.nodal:
+            self._streams["u_node"] = open(self._binary_path("u_node"), "wb")
+            self._node_matrix = mesh.node_matrix()
+            self._node_boundary = mesh.node_boundary_matrix()
+
+        element_count = mesh.element_count
+        self._grid_template = (
+            '   <Grid Name="step_{iteration}" GridType="Uniform">\n'
+            '    <Time Value="{time!r}"/>\n'
+            f'    <Topology TopologyType="{topology_type}" NumberOfElements="{element_count}">\n'
+            f'     {_data_item(self._files["topology"], dimensions, connectivity.dtype)}\n'
+            '    </Topology>\n'
+            '    <Geometry GeometryType="XY">\n'
+            f'     {_data_item(self._files["geometry"], f"{len(points)} 2", points.dtype)}\n'
+            '    </Geometry>\n'
+            '{attributes}'
+            '   </Grid>\n'
+        )
+        self._streams["xdmf"] = open(self.path, "w")
+        self._streams["xdmf"].write(
+            '<?xml version="1.0" ?>\n<Xdmf Version="3.0">\n <Domain>\n'
+            '  <Grid Name="TimeSeries" GridType="Collection" CollectionType="Temporal">\n'
+        )
+
+    def on_step(self, solver) -> None:
+        if solver.iteration_count % self.every == 0:
+            self.record(solver.u, solver.iteration_count, solver.time, solver.mesh.bound_u)
+
+    def record(
+            self,
+            u: np.ndarray,
+            iteration: int = 0,
+            time: float = 0,
+            bound_u: Optional[np.ndarray] = None
+    ) -> None:
+        """
+        Append one step; `bound_u` gives the boundary temperatures of the nodal field
+        (those of `mesh` if not given, which are stale for time-dependent boundaries).
+        """
+        if not self._streams:
+            self._open()
+        mesh = self.mesh
+        stream = self._streams["u"]
+        attributes = (
+            '    <Attribute Name="u" AttributeType="Scalar" Center="Cell">\n'
+            f'     {_data_item(self._files["u"], str(mesh.element_count), self.dtype, stream.tell())}\n'
+            '    </Attribute>\n'
+        )
+        np.asarray(u, dtype=self.dtype).tofile(stream)
+        if self.nodal:
+            node_stream = self._streams["u_node"]
+            values = mesh.set_node_boundary(self._node_matrix @ u, self._node_boundary, bound_u)
+            attributes += (
+                '    <Attribute Name="u_node" AttributeType="Scalar" Center="Node">\n'
+                f'     {_data_item(self._files["u_node"], str(len(values)), self.dtype, node_stream.tell())}\n'
+                '    </Attribute>\n'
+            )
+            values.astype(self.dtype).tofile(node_stream)
+
+        #  новая сетка пишется поверх закрывающих тегов, затем теги дописываются снова
+        xdmf = self._streams["xdmf"]
+        xdmf.write(self._grid_template.format(iteration=iteration, time=float(time), attributes=attributes))
+        position = xdmf.tell()
+        xdmf.write(XDMF_FOOTER)
+        xdmf.flush()
+        xdmf.seek(position)
+        self.frame_count += 1
+
+    def write(self, u: np.ndarray, iteration: int, time: float, bound_u: Optional[np.ndarray] = None) -> None:
+        self.record(u, iteration, time, bound_u)
+
+    def flush(self) -> None:
+        for stream in self._streams.values():
+            stream.flush()
+
+    def close(self) -> None:
+        if not self._streams:
+            return
+        self._streams["xdmf"].write(XDMF_FOOTER)
+        for stream in self._streams.values():
+            stream.close()
+        self._streams = dict()
+
+    def __enter__(self) -> "XdmfWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()